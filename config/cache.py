@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+# Values of these types are immutable and kept as they are in memory,
+# everything else is kept pickled so callers never share a mutable object.
+IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU with a maximum age per entry
+    """
+
+    def __init__(self, max_entries: int, timeout: int):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, object]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+            expires_at, pickled, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+        return True, pickle.loads(value) if pickled else value
+
+    def set(self, key: str, value, timeout: int | None) -> None:
+        if self.max_entries <= 0 or timeout == 0:
+            return self.delete(key)
+        if timeout is None or timeout > self.timeout:
+            timeout = self.timeout
+        pickled = not isinstance(value, IMMUTABLE_TYPES)
+        if pickled:
+            value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, pickled, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class LocalTier:
+    """
+    The local cache of a process, and the node id its listener ignores
+    """
+
+    def __init__(self, cache: LocalCache):
+        self.cache = cache
+        self.node = uuid.uuid4().hex
+        self.pid = None
+        self.lock = threading.Lock()
+
+
+# Django makes a cache instance per thread, the local tier and its listener
+# are shared by all of them, one per server and channel in each process
+tiers: dict[tuple[str, str], LocalTier] = {}
+tiers_lock = threading.Lock()
+
+
+class TwoTierRedisCache(RedisCache):
+    """
+    Redis cache with a bounded in-process LRU tier in front of it.
+
+    Hot keys are served from the memory of the worker. Every write is
+    published on a Redis channel, and each process listens on it to drop
+    its local copy, so invalidations reach all workers. A local copy is
+    never older than LOCAL_TIMEOUT, even if a message is lost.
+
+    Extra OPTIONS:
+    - LOCAL_MAX_ENTRIES: size of the local tier (0 disables it)
+    - LOCAL_TIMEOUT: maximum age in seconds of a local entry
+    - CHANNEL: name of the pub/sub channel
+    """
+
+    def __init__(self, server, params):
+        options = dict(params.get("OPTIONS", {}))
+        max_entries = options.pop("LOCAL_MAX_ENTRIES", 300)
+        timeout = options.pop("LOCAL_TIMEOUT", 60)
+        self._channel = options.pop("CHANNEL", "cache-invalidation")
+        with tiers_lock:
+            self._tier = tiers.setdefault(
+                (str(server), self._channel),
+                LocalTier(LocalCache(max_entries=max_entries, timeout=timeout)),
+            )
+        self._local = self._tier.cache
+        super().__init__(server, {**params, "OPTIONS": options})
+
+    # Invalidation
+
+    def _ensure_listener(self) -> None:
+        # The listener is started lazily, so that each forked worker runs its own
+        tier = self._tier
+        if tier.pid == os.getpid():
+            return
+        with tier.lock:
+            if tier.pid == os.getpid():
+                return
+            self._local.clear()
+            # Forked workers must not ignore each other's messages
+            tier.node = uuid.uuid4().hex
+            tier.pid = os.getpid()
+            thread = threading.Thread(
+                target=self._listen, name="cache-invalidation", daemon=True
+            )
+            thread.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._cache.get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    self._handle_message(message["data"])
+            except Exception:
+                logger.exception("Cache invalidation listener disconnected")
+            # Messages may have been missed in the meantime
+            self._local.clear()
+            time.sleep(1)
+
+    def _handle_message(self, data: bytes) -> None:
+        message = json.loads(data)
+        if message["node"] == self._tier.node:
+            return
+        if message.get("clear"):
+            self._local.clear()
+        for key in message.get("keys", []):
+            self._local.delete(key)
+
+    def _publish(self, keys=(), clear=False) -> None:
+        self._ensure_listener()
+        message = {"node": self._tier.node, "keys": list(keys), "clear": clear}
+        try:
+            self._cache.get_client(write=True).publish(
+                self._channel, json.dumps(message)
+            )
+        except Exception:
+            logger.exception("Could not publish cache invalidation")
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        self._ensure_listener()
+        key = self.make_and_validate_key(key, version=version)
+        found, value = self._local.get(key)
+        if found:
+            return value
+        missing = object()
+        value = self._cache.get(key, missing)
+        if value is missing:
+            return default
+        self._local.set(key, value, self._local.timeout)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._ensure_listener()
+        key_map = {
+            self.make_and_validate_key(key, version=version): key for key in keys
+        }
+        ret = {}
+        for key in key_map:
+            found, value = self._local.get(key)
+            if found:
+                ret[key] = value
+        if misses := [key for key in key_map if key not in ret]:
+            for key, value in self._cache.get_many(misses).items():
+                self._local.set(key, value, self._local.timeout)
+                ret[key] = value
+        return {key_map[k]: v for k, v in ret.items()}
+
+    def has_key(self, key, version=None):
+        found, _ = self._local.get(self.make_and_validate_key(key, version=version))
+        return found or super().has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._ensure_listener()
+        super().set(key, value, timeout, version=version)
+        key = self.make_and_validate_key(key, version=version)
+        self._local.set(key, value, self.get_backend_timeout(timeout))
+        self._publish([key])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._ensure_listener()
+        super().set_many(data, timeout, version=version)
+        keys = []
+        for key, value in data.items():
+            key = self.make_and_validate_key(key, version=version)
+            self._local.set(key, value, self.get_backend_timeout(timeout))
+            keys.append(key)
+        self._publish(keys)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        cache_key = self.make_and_validate_key(key, version=version)
+        # A local copy may outlive the Redis key it was read from
+        self._local.delete(cache_key)
+        added = super().add(key, value, timeout, version=version)
+        if added:
+            self._publish([cache_key])
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        cache_key = self.make_and_validate_key(key, version=version)
+        # Dropped even if Redis fails, and again for a concurrent read of the
+        # old value in another thread
+        self._local.delete(cache_key)
+        value = super().incr(key, delta, version=version)
+        self._local.delete(cache_key)
+        self._publish([cache_key])
+        return value
+
+    def delete(self, key, version=None):
+        deleted = super().delete(key, version=version)
+        key = self.make_and_validate_key(key, version=version)
+        self._local.delete(key)
+        self._publish([key])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        if not keys:
+            return
+        super().delete_many(keys, version=version)
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        for key in keys:
+            self._local.delete(key)
+        self._publish(keys)
+
+    def clear(self):
+        self._local.clear()
+        self._publish(clear=True)
+        return super().clear()
@@ -1,19 +1,118 @@
+from copy import copy
 from typing import Any
 
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.redirects.models import Redirect
 from django.contrib.sites.models import Site
-from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, NullIf
 from django.urls import reverse
 from django.utils import translation
 from django.utils.text import slugify
 from django.utils.translation import get_language
+from django.utils.translation import gettext as _
+
+# Slugs resolved from the slug index are memoized for a day at most
+SLUG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def on_commit_once(key: str, func) -> None:
+    """
+    Like ``transaction.on_commit`` but ``func`` is registered only once per
+    ``key`` in the current transaction, e.g. when an admin form saves a
+    recipe together with all of its inlines.
+    """
+    connection = transaction.get_connection()
+    # Callbacks that already ran, e.g. with captureOnCommitCallbacks() in
+    # tests, are still listed until the transaction ends
+    if connection.in_atomic_block and any(
+        getattr(callback, "commit_key", None) == key and not callback.done
+        for _, callback, _ in connection.run_on_commit
+    ):
+        return
+
+    def callback():
+        callback.done = True
+        func()
+
+    callback.commit_key = key
+    callback.done = False
+    transaction.on_commit(callback)
+
+
+def configure_sqlite(connection) -> None:
+    """
+    Apply SQLITE_PRAGMAS to a new connection. With WAL, readers don't wait
+    for the writer (e.g. a huey task), and writers wait ``busy_timeout``
+    for each other instead of failing with "database is locked".
+    """
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def optimize_sqlite(connection) -> None:
+    """
+    Refresh the statistics of the query planner (ANALYZE) for the tables
+    whose content changed enough since the last run
+    """
+    with connection.cursor() as cursor:
+        # Bounds the rows ANALYZE reads per index, the statistics stay exact
+        # enough for the planner
+        cursor.execute("PRAGMA analysis_limit = 1000")
+        # Checks all tables, not only the ones this connection used
+        cursor.execute("PRAGMA optimize = 0x10002")
+
+
+def content_language() -> str:
+    """
+    The active language if the models are translated in it, German otherwise
+    """
+    lang = get_language()
+    return lang if lang in settings.LANGUAGE_CODES else "de"
+
+
+def localized_name(field: str, lang: str) -> str:
+    """Name of the annotation of ``LocalizedQuerySet.localized``"""
+    return f"_localized_{field}_{lang}"
+
+
+class LocalizedQuerySet(models.QuerySet):
+    def localized(self, *fields: str):
+        """
+        Load only the active language of the translated ``fields`` (e.g.
+        ``"title"``), falling back to German in the database. The columns
+        of the other languages are deferred, and ``get_localized_value``
+        reads the annotation.
+        """
+        lang = content_language()
+        annotations = {}
+        deferred = []
+        for field in fields:
+            value = models.F(f"{field}_de")
+            if lang != "de":
+                output_field = self.model._meta.get_field(f"{field}_de")
+                empty = models.Value("", output_field=output_field)
+                value = Coalesce(
+                    NullIf(models.F(f"{field}_{lang}"), empty),
+                    value,
+                    output_field=output_field,
+                )
+            annotations[localized_name(field, lang)] = value
+            deferred += [f"{field}_{code}" for code in settings.LANGUAGE_CODES]
+        return self.annotate(**annotations).defer(*deferred)
 
 
 class CustomModel(models.Model):
     class Meta:
         abstract = True
 
+    objects = LocalizedQuerySet.as_manager()
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -27,7 +126,11 @@ class CustomModel(models.Model):
         return settings.WEBSITE_URL + self.admin_url
 
     def get_localized_value(self, attr: str) -> Any | None:
-        lang = get_language()
+        lang = content_language()
+        # Loaded by LocalizedQuerySet.localized() in the current language
+        localized = localized_name(attr, lang)
+        if localized in self.__dict__:
+            return self.__dict__[localized]
         value = getattr(self, f"{attr}_{lang}", None)
         return value
 
@@ -48,6 +151,8 @@ class PageModel(CustomModel):
     slug_fr = models.SlugField(max_length=256, null=True, blank=True)
     slug_es = models.SlugField(max_length=256, null=True, blank=True)
     slug_it = models.SlugField(max_length=256, null=True, blank=True)
+    # Deleted together with the page
+    slug_index = GenericRelation("core.SlugIndex")
 
     @property
     def title(self):
@@ -57,41 +162,197 @@ class PageModel(CustomModel):
     def slug(self):
         return self.get_localized_value("slug") or self.slug_de
 
+    @property
+    def slugs(self) -> set[str]:
+        """All slugs the page can be reached with"""
+        return set(self.localized_slugs().values())
+
+    @property
+    def cached_slugs(self) -> set[str]:
+        """
+        The slugs its pages may be cached under, the ones before the last
+        save included
+        """
+        return self.slugs | getattr(self, "_previous_slugs", set())
+
+    @classmethod
+    def slugs_for(cls, **filters) -> set[str]:
+        """All slugs of the pages matching ``filters``"""
+        fields = [f"slug_{lang}" for lang in settings.LANGUAGE_CODES]
+        rows = cls.objects.filter(**filters).values_list(*fields)
+        return {slug for row in rows for slug in row if slug}
+
+    def localized_slugs(self) -> dict[str, str]:
+        slugs = {
+            lang: getattr(self, f"slug_{lang}") for lang in settings.LANGUAGE_CODES
+        }
+        return {lang: slug for lang, slug in slugs.items() if slug}
+
+    @classmethod
+    def slug_cache_key(cls, slug: str) -> str:
+        return f"slug:{cls._meta.label_lower}:{slug}"
+
+    @classmethod
+    def pk_for_slug(cls, slug: str) -> int | None:
+        """
+        Primary key of the page with ``slug`` in any language (preferring
+        the current one), found in the slug index and memoized in the cache.
+        Misses aren't memoized, the slug may be taken at any time.
+        """
+        from core.models import SlugIndex
+
+        key = cls.slug_cache_key(slug)
+        pks = cache.get(key)
+        if pks is None:
+            entries = SlugIndex.objects.filter(
+                content_type=ContentType.objects.get_for_model(cls), slug=slug
+            )
+            pks = dict(entries.values_list("language", "object_id"))
+            if pks:
+                cache.set(key, pks, SLUG_CACHE_TIMEOUT)
+        return pks.get(get_language()) or next(iter(pks.values()), None)
+
+    def forget_slugs(self, slugs) -> None:
+        keys = [self.slug_cache_key(slug) for slug in slugs]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def update_slug_index(self) -> None:
+        from core.models import SlugIndex
+
+        indexed = {
+            (entry.language, entry.slug): entry.pk for entry in self.slug_index.all()
+        }
+        wanted = set(self.localized_slugs().items())
+        if stale := [pk for item, pk in indexed.items() if item not in wanted]:
+            self.slug_index.filter(pk__in=stale).delete()
+        SlugIndex.objects.bulk_create(
+            SlugIndex(content_object=self, language=lang, slug=slug)
+            for lang, slug in wanted - indexed.keys()
+        )
+        self.forget_slugs({slug for lang, slug in wanted ^ indexed.keys()})
+
+    def clean(self):
+        from core.models import SlugIndex
+
+        super().clean()
+        # Slugs are unique per language, see SlugIndex
+        content_type = ContentType.objects.get_for_model(self)
+        for lang in settings.LANGUAGE_CODES:
+            if not (slug := slugify(getattr(self, f"title_{lang}") or "")):
+                continue
+            taken = SlugIndex.objects.filter(
+                content_type=content_type, language=lang, slug=slug
+            )
+            if taken.exclude(object_id=self.pk).exists():
+                raise ValidationError(
+                    _("The title %(title)s is already used (%(lang)s).")
+                    % {"title": getattr(self, f"title_{lang}"), "lang": lang}
+                )
+
     @property
     def url(self):
         if hasattr(self, "get_absolute_url"):
             return self.get_absolute_url()
         raise NotImplementedError
 
-    def save(self, *args, **kwargs):
-        is_new = self._state.adding
-        old_instance = None
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._initial_slugs = instance.loaded_slugs()
+        return instance
 
-        if not is_new and self.pk:
-            # Load old instance for comparison
-            old_instance = self.__class__.objects.filter(pk=self.pk).first()
+    def loaded_slugs(self) -> dict[str, str | None]:
+        """The slugs by language, without loading the deferred ones"""
+        return {
+            lang: self.__dict__[f"slug_{lang}"]
+            for lang in settings.LANGUAGE_CODES
+            if f"slug_{lang}" in self.__dict__
+        }
 
-        # Auto slugify
+    def initial_slugs(self) -> dict[str, str]:
+        """
+        The slugs of the page in the database by language, as they were when
+        it was loaded. Only the deferred ones are queried.
+        """
+        if self.pk is None:
+            return {}
+        slugs = getattr(self, "_initial_slugs", {})
+        if missing := [lang for lang in settings.LANGUAGE_CODES if lang not in slugs]:
+            fields = [f"slug_{lang}" for lang in missing]
+            row = self.__class__.objects.filter(pk=self.pk).values(*fields).first()
+            slugs |= {lang: (row or {}).get(f"slug_{lang}") for lang in missing}
+            self._initial_slugs = slugs
+        return {lang: slug for lang, slug in slugs.items() if slug}
+
+    def url_for_slugs(self, slugs: dict[str, str]) -> str:
+        """The url of the page in the current language with other ``slugs``"""
+        page = copy(self)
+        page.__dict__.pop(localized_name("slug", content_language()), None)
         for lang in settings.LANGUAGE_CODES:
-            if not hasattr(self, f"title_{lang}") or not hasattr(self, f"slug_{lang}"):
-                continue
-            title_value = getattr(self, f"title_{lang}", None)
-            if title_value is None:
+            setattr(page, f"slug_{lang}", slugs.get(lang))
+        return str(page.url)
+
+    def update_redirects(self, previous: dict[str, str]) -> None:
+        """
+        Redirect the old url of each language whose slug changed to the new
+        one, written in a single upsert
+        """
+        current = self.localized_slugs()
+        redirects = {}
+        site = None
+        for lang in settings.LANGUAGE_CODES:
+            # Languages without a slug fall back to the German one
+            old_slug = previous.get(lang) or previous.get("de")
+            if not old_slug or old_slug == (current.get(lang) or current.get("de")):
                 continue
-            setattr(self, f"slug_{lang}", slugify(title_value))
-
-        super().save(*args, **kwargs)
-
-        # --- Create redirects if slugs changed ---
-        if old_instance:
-            site = Site.objects.get_current()
-            for lang in settings.LANGUAGE_CODES:
-                with translation.override(lang):
-                    old_path = old_instance.url
-                    new_path = self.url
-                    if old_path != new_path:
-                        Redirect.objects.update_or_create(
-                            site=site,
-                            old_path=old_path,
-                            defaults={"new_path": new_path},
-                        )
+            site = site or Site.objects.get_current()
+            with translation.override(lang):
+                old_path = self.url_for_slugs(previous)
+                new_path = self.url_for_slugs(current)
+            # Languages can share a url, e.g. without a language prefix
+            if old_path != new_path:
+                redirects[old_path] = Redirect(
+                    site=site, old_path=old_path, new_path=new_path
+                )
+        if not redirects:
+            return
+        # Earlier redirects to the old urls skip a hop, and the new urls are
+        # live again (e.g. after a rename is undone)
+        for redirect in redirects.values():
+            site.redirect_set.filter(new_path=redirect.old_path).update(
+                new_path=redirect.new_path
+            )
+        new_paths = [redirect.new_path for redirect in redirects.values()]
+        site.redirect_set.filter(old_path__in=new_paths).delete()
+        Redirect.objects.bulk_create(
+            redirects.values(),
+            update_conflicts=True,
+            unique_fields=["site", "old_path"],
+            update_fields=["new_path"],
+        )
+
+    def save(self, *args, **kwargs):
+        previous = self.initial_slugs()
+        # Pages cached under the previous slugs must be purged as well
+        self._previous_slugs = set(previous.values())
+
+        for lang in settings.LANGUAGE_CODES:
+            # Deferred slugs were just queried by initial_slugs()
+            if self.pk is not None:
+                self.__dict__.setdefault(f"slug_{lang}", self._initial_slugs[lang])
+            # Auto slugify, deferred titles haven't changed
+            title_value = self.__dict__.get(f"title_{lang}")
+            if title_value is not None:
+                setattr(self, f"slug_{lang}", slugify(title_value))
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_slug_index()
+            if previous:
+                self.update_redirects(previous)
+        self._initial_slugs = self.loaded_slugs()
+
+    def delete(self, *args, **kwargs):
+        self.forget_slugs(self.slugs)
+        return super().delete(*args, **kwargs)
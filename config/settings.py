@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/dev/ref/settings/
 """
 
+import subprocess
+import warnings
 from copy import copy
 from pathlib import Path
 
@@ -79,6 +81,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.CompressionMiddleware",
+    "core.middleware.NPlusOneMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -120,9 +124,27 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Connections are kept between requests, and checked before reuse
+        "CONN_MAX_AGE": env.int("CONN_MAX_AGE", 600),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Transactions take the write lock when they start, so a writer
+            # waits for the busy timeout instead of failing to upgrade its lock
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# Applied to every new SQLite connection (see config.db.configure_sqlite)
+SQLITE_PRAGMAS = {
+    "journal_mode": env.str("SQLITE_JOURNAL_MODE", "wal"),
+    "synchronous": env.str("SQLITE_SYNCHRONOUS", "normal"),
+    "busy_timeout": env.int("SQLITE_BUSY_TIMEOUT", 5000),  # milliseconds
+    "cache_size": env.int("SQLITE_CACHE_SIZE", -64_000),  # negative: in KiB
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+    "temp_store": "memory",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
@@ -168,6 +190,10 @@ LANGUAGE_CODES_WITHOUT_DEFAULT.remove(LANGUAGE_CODE)
 
 LOCALE_PATHS = [BASE_DIR / "locale"]
 
+# Serve pages under a language prefix (e.g. /fr/) instead of negotiating the
+# language from the Accept-Language header
+LANGUAGE_URL_PREFIX = env.bool("LANGUAGE_URL_PREFIX", False)
+
 DEEPL_AUTH_KEY = env("DEEPL_AUTH_KEY")
 
 # Append slash
@@ -253,14 +279,59 @@ WHITENOISE_MAX_AGE = 0 if DEBUG else 31_536_000
 REDIS_URL = env("REDIS_URL")
 REDIS_CONNECTION_POOL = RedisConnectionPool.from_url(url=REDIS_URL)
 
+
+def git_revision() -> str:
+    """The short git revision of the checkout, empty if it isn't known"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.strip()
+
+
+# Release of the code, the git revision of the checkout by default
+RELEASE = env.str("RELEASE", "") or git_revision()
+if not RELEASE:
+    warnings.warn(
+        "No release: set RELEASE, cached pages are kept across deploys",
+        stacklevel=1,
+    )
+
 # Caching
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "BACKEND": "config.cache.TwoTierRedisCache",
         "LOCATION": REDIS_URL,
+        # A deploy starts with new keys, cached markup of the previous
+        # release is never served
+        "KEY_PREFIX": RELEASE,
+        "OPTIONS": {
+            "LOCAL_MAX_ENTRIES": env.int("CACHE_LOCAL_MAX_ENTRIES", 300),
+            "LOCAL_TIMEOUT": env.int("CACHE_LOCAL_TIMEOUT", 60),
+        },
     }
 }
 
+# Cached pages are purged when their content changes (see core.cache),
+# the timeout is only a safety net. After the soft timeout a cached page is
+# still served while a task renders it again, so visitors don't wait for it.
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", 60 * 60 * 24 * 7)
+PAGE_CACHE_SOFT_TIMEOUT = env.int(
+    "PAGE_CACHE_SOFT_TIMEOUT", PAGE_CACHE_TIMEOUT - 60 * 60 * 24
+)
+
+# Edge cache (CDN or reverse proxy) in front of the site, purged by tag
+PURGE_BACKEND = env.str("PURGE_BACKEND", "core.purge.DummyPurgeBackend")
+PURGE_URL = env.str("PURGE_URL", "")
+PURGE_TOKEN = env.str("PURGE_TOKEN", "")
+PURGE_BATCH_SIZE = env.int("PURGE_BATCH_SIZE", 30)
+
 
 # huey
 HUEY_IMMEDIATE = env.bool("HUEY_IMMEDIATE")
@@ -287,6 +358,11 @@ HUEY = {
     },
 }
 
+# N+1 query detection (see core.middleware.NPlusOneMiddleware)
+NPLUSONE_DETECTOR = env.bool("NPLUSONE_DETECTOR", False)
+NPLUSONE_THRESHOLD = env.int("NPLUSONE_THRESHOLD", 5)
+NPLUSONE_RAISE = env.bool("NPLUSONE_RAISE", False)
+
 # Links
 WEBSITE_URL = env("WEBSITE_URL")
 WHATSAPP_URL = "https://wa.me/+41772363205"
@@ -0,0 +1,101 @@
+import time
+import uuid
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase
+
+from config.cache import LocalCache, TwoTierRedisCache
+
+
+class LocalCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        local = LocalCache(max_entries=2, timeout=60)
+        local.set("a", 1, None)
+        local.set("b", 2, None)
+        local.get("a")
+        local.set("c", 3, None)
+        self.assertEqual(local.get("a"), (True, 1))
+        self.assertEqual(local.get("b"), (False, None))
+        self.assertEqual(local.get("c"), (True, 3))
+
+    def test_entries_expire_within_the_local_timeout(self):
+        local = LocalCache(max_entries=10, timeout=60)
+        with mock.patch("config.cache.time.monotonic", return_value=100):
+            local.set("short", 1, 5)
+            local.set("long", 2, None)
+        with mock.patch("config.cache.time.monotonic", return_value=106):
+            self.assertEqual(local.get("short"), (False, None))
+            self.assertEqual(local.get("long"), (True, 2))
+        with mock.patch("config.cache.time.monotonic", return_value=161):
+            self.assertEqual(local.get("long"), (False, None))
+
+    def test_mutable_values_are_not_shared(self):
+        local = LocalCache(max_entries=10, timeout=60)
+        value = {"a": [1]}
+        local.set("key", value, None)
+        value["a"].append(2)
+        self.assertEqual(local.get("key"), (True, {"a": [1]}))
+
+
+class TwoTierRedisCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def make_cache(self, location: str) -> TwoTierRedisCache:
+        """
+        A cache on the fake server, each location stands for another process
+        """
+        options = {"connection_class": fakeredis.FakeConnection, "server": self.server}
+        return TwoTierRedisCache(f"redis://{location}", {"OPTIONS": options})
+
+    def make_processes(self) -> tuple[TwoTierRedisCache, TwoTierRedisCache]:
+        first = self.make_cache(uuid.uuid4().hex)
+        second = self.make_cache(uuid.uuid4().hex)
+        client = first._cache.get_client()
+        for cache in (first, second):
+            cache.get("warm-up")
+        self.wait_for(lambda: client.pubsub_numsub("cache-invalidation")[0][1] == 2)
+        return first, second
+
+    def wait_for(self, condition) -> None:
+        deadline = time.monotonic() + 5
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out")
+            time.sleep(0.01)
+
+    def redis_delete(self, cache: TwoTierRedisCache, key: str) -> None:
+        """Drop a key in Redis only, like an expiry"""
+        cache._cache.get_client(write=True).delete(cache.make_and_validate_key(key))
+
+    def test_threads_share_the_local_tier(self):
+        location = uuid.uuid4().hex
+        first, second = self.make_cache(location), self.make_cache(location)
+        first.set("key", "value")
+        self.redis_delete(first, "key")
+        self.assertEqual(second.get("key"), "value")
+
+    def test_writes_invalidate_other_processes(self):
+        first, second = self.make_processes()
+        first.set("key", "old")
+        self.assertEqual(second.get("key"), "old")
+        first.set("key", "new")
+        self.wait_for(lambda: second.get("key") == "new")
+        first.delete("key")
+        self.wait_for(lambda: second.get("key") is None)
+
+    def test_add_drops_an_expired_local_copy(self):
+        cache = self.make_cache(uuid.uuid4().hex)
+        cache.set("key", "old")
+        self.redis_delete(cache, "key")
+        self.assertTrue(cache.add("key", "new"))
+        self.assertEqual(cache.get("key"), "new")
+
+    def test_failed_incr_drops_the_local_copy(self):
+        cache = self.make_cache(uuid.uuid4().hex)
+        cache.set("counter", 1)
+        self.redis_delete(cache, "counter")
+        with self.assertRaises(ValueError):
+            cache.incr("counter")
+        self.assertIsNone(cache.get("counter"))
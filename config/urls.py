@@ -17,17 +17,30 @@ Including another URLconf
 
 from debug_toolbar.toolbar import debug_toolbar_urls
 from django.conf import settings
+from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.urls import page_urlpatterns
+
+pages = [
+    path("", include(page_urlpatterns)),
+    path("👨‍🍳/", include("recipes.urls")),
+    path("🍰/", include("products.urls")),
+]
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("core.urls")),
-    path("👨‍🍳/", include("recipes.urls")),
-    path("🍰/", include("products.urls")),
 ]
 
+if settings.LANGUAGE_URL_PREFIX:
+    # e.g. /fr/👨‍🍳/couscous, unprefixed urls are redirected by LocaleMiddleware
+    urlpatterns += i18n_patterns(*pages)
+else:
+    urlpatterns += pages
+
 
 if settings.DEBUG:
     urlpatterns.append(path("__reload__/", include("django_browser_reload.urls")))
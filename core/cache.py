@@ -0,0 +1,350 @@
+import gzip
+import hashlib
+import io
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from functools import lru_cache, wraps
+from urllib.parse import unquote_to_bytes, urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .compression import accepted_encoding, compress, minified_content
+from .purge import add_cache_tags, purge_tags
+
+# How long a cache fill may hold its lock, and how long others wait for it
+FILL_LOCK_TIMEOUT = 30
+FILL_WAIT = 5
+
+
+def acquire_fill_lock(key: str) -> bool:
+    """
+    Take the lock to fill ``key``, shared by all workers (a SET NX in Redis)
+    """
+    return cache.add(f"{key}:lock", 1, timeout=FILL_LOCK_TIMEOUT)
+
+
+def release_fill_lock(key: str) -> None:
+    cache.delete(f"{key}:lock")
+
+
+def wait_for_fill(key: str, accept: Callable = lambda value: True, wait=FILL_WAIT):
+    """
+    Wait a bounded time for the lock holder to fill ``key``
+    """
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if value is not None and accept(value):
+            return value
+    return None
+
+
+def version_cache_key(name: str) -> str:
+    return f"version:{name}"
+
+
+def get_versions(*names: str) -> dict[str, int]:
+    """
+    Current content versions, the time in nanoseconds of their last change,
+    e.g. ``{"products": 1760781600000000000, "faqs": 1760695200000000000}``
+    """
+    keys = {version_cache_key(name): name for name in names}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        # A time based start never reuses the version of an evicted key
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def new_versions(keys: Iterable[str]) -> None:
+    """
+    Move the versions at ``keys`` to the current time
+    """
+    current = cache.get_many(keys)
+    now = time.time_ns()
+    # Always moves forward, even if the clock doesn't
+    versions = {key: max(now, current.get(key, 0) + 1) for key in keys}
+    cache.set_many(versions, timeout=None)
+
+
+def bump_version(name: str) -> None:
+    """
+    Start a new content version once the current transaction is committed,
+    pages tagged with it are purged from the edge cache
+    """
+    keys = [version_cache_key(name)]
+    transaction.on_commit(lambda: new_versions(keys))
+    purge_tags([name])
+
+
+def versions_modified(*names: str) -> datetime | None:
+    """
+    When the content of one of the given versions last changed
+    """
+    if not names:
+        return None
+    stamp = max(get_versions(*names).values())
+    return datetime.fromtimestamp(stamp / 1e9, tz=UTC)
+
+
+def page_cache_key(name: str, lang: str, ident: str = "") -> str:
+    """
+    Cache key of a rendered page, e.g. ``page:recipe_detail:couscous:fr``.
+
+    Pages build their absolute URLs from ``settings.WEBSITE_URL``, so the
+    same copy is served for every host and scheme.
+    """
+    return f"page:{name}:{ident}:{lang}"
+
+
+def page_tag(name: str, ident: str = "") -> str:
+    """
+    Edge cache tag of a page, e.g. ``recipe_detail:couscous``
+    """
+    return f"{name}:{ident}" if ident else name
+
+
+def page_version(name: str, ident: str = "") -> str:
+    """
+    Version of a page for every language, e.g. ``page:recipe_detail:couscous``
+    """
+    return f"page:{page_tag(name, ident)}"
+
+
+def invalidate_pages(name: str, idents: Iterable[str] = ("",)) -> None:
+    """
+    Start a new version of the pages once the current transaction is
+    committed. Their cached copies are stale from then on, including the
+    ones stored later by a render that read the old content.
+    """
+    idents = set(idents)
+    keys = [version_cache_key(page_version(name, ident)) for ident in idents]
+    transaction.on_commit(lambda: new_versions(keys))
+    purge_tags(page_tag(name, ident) for ident in idents)
+
+
+class CachedPage:
+    """
+    A rendered page as it is kept in the cache.
+
+    The body is minified and compressed once, when the page is stored, and
+    each hit gets the smallest encoding the client accepts. The raw body is
+    only kept when compression doesn't pay off, otherwise it's decompressed
+    from gzip for the rare client that accepts no encoding.
+    """
+
+    def __init__(self, response: HttpResponse):
+        content = minified_content(response)
+        self.status_code = response.status_code
+        self.headers = {
+            name: value
+            for name, value in response.items()
+            if name.lower() != "content-length"
+        }
+        self.bodies = compress(content)
+        if "gzip" not in self.bodies:
+            self.bodies[""] = content
+
+    def to_response(self, request) -> HttpResponse:
+        encoding = accepted_encoding(request, self.bodies)
+        if encoding or "" in self.bodies:
+            body = self.bodies[encoding]
+        else:
+            body = gzip.decompress(self.bodies["gzip"])
+        response = HttpResponse(body, status=self.status_code, headers=self.headers)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.bodies.keys() != {""}:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+def is_current(entry, stamp: tuple) -> bool:
+    """
+    Whether a cache ``entry`` holds the page of the given versions ``stamp``
+    """
+    # Entries of an older format are rendered again
+    return entry is not None and entry[0] == stamp and isinstance(entry[2], CachedPage)
+
+
+def page_request(path: str, lang: str, refresh: bool = False) -> HttpRequest:
+    """
+    A request for a page of the website, made outside of a request
+    """
+    website = urlsplit(settings.WEBSITE_URL)
+    secure = website.scheme == "https"
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        # WSGI paths are bytes decoded as latin-1, ``path`` may be quoted
+        "PATH_INFO": unquote_to_bytes(path).decode("iso-8859-1"),
+        "QUERY_STRING": "",
+        "SERVER_NAME": website.hostname,
+        "SERVER_PORT": str(website.port or (443 if secure else 80)),
+        "HTTP_HOST": website.netloc,
+        "HTTP_ACCEPT_LANGUAGE": lang,
+        "wsgi.url_scheme": website.scheme,
+        "wsgi.input": io.BytesIO(),
+    }
+    if secure:
+        # Like the proxy in front of the site (see SECURE_PROXY_SSL_HEADER)
+        environ["HTTP_X_FORWARDED_PROTO"] = "https"
+    request = WSGIRequest(environ)
+    request.cache_refresh = refresh
+    return request
+
+
+def render_page(path: str, lang: str, refresh: bool = False) -> HttpResponse:
+    """
+    Render a page through the whole middleware stack outside of a request,
+    e.g. from a task. With ``refresh`` the cached copy is rendered again.
+    """
+    return page_handler().get_response(page_request(path, lang, refresh))
+
+
+@lru_cache(maxsize=1)
+def page_handler() -> BaseHandler:
+    handler = BaseHandler()
+    handler.load_middleware()
+    return handler
+
+
+def cache_object_page(
+    name: str,
+    ident_kwarg: str = "slug",
+    versions: Iterable[str] = (),
+    timeout=None,
+    soft_timeout=None,
+):
+    """
+    Cache a page per object and language.
+
+    Unlike ``cache_page`` the key does not depend on the request headers.
+    The entry is stamped with the versions read before rendering: the one
+    of the page, started again by ``invalidate_pages`` when its content
+    changes, and the shared content it lists in ``versions``. It's stale
+    once one of them moves.
+
+    The (hard) timeout is only a safety net. Before it's reached the page
+    is refreshed in the background: after the ``soft_timeout`` the cached
+    copy is still served, while a task renders it again. Pages cached with
+    the default timeout get the default ``PAGE_CACHE_SOFT_TIMEOUT``.
+
+    Cached pages are served pre-compressed, see ``CachedPage``. Responses
+    are tagged with the page and its versions for an edge cache.
+    """
+    versions = tuple(versions)
+    if timeout is None:
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if soft_timeout is None:
+            soft_timeout = settings.PAGE_CACHE_SOFT_TIMEOUT
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapper(request, *args, **kwargs):
+            ident = kwargs.get(ident_kwarg, "")
+            tags = [page_tag(name, ident), *versions]
+            if request.method not in ("GET", "HEAD") or request.GET:
+                response = view_func(request, *args, **kwargs)
+                add_cache_tags(response, tags)
+                return response
+
+            lang = get_language()
+            key = page_cache_key(name, lang, ident)
+            names = (*versions, page_version(name, ident))
+            current = get_versions(*names)
+            stamp = tuple(current[version] for version in names)
+            refresh = getattr(request, "cache_refresh", False)
+            entry = None if refresh else cache.get(key)
+            if is_current(entry, stamp):
+                stamp, fresh_until, page = entry
+                if fresh_until is not None and fresh_until < time.time():
+                    # Only one refresh is queued for all concurrent requests
+                    if cache.add(f"{key}:refreshing", 1, timeout=60):
+                        from .tasks import task_refresh_page
+
+                        task_refresh_page(request.path_info, lang)
+                return page.to_response(request)
+
+            # Only one worker renders a missing page, the others wait for it
+            # or get the copy of a previous version
+            locked = not refresh and acquire_fill_lock(key)
+            if not refresh and not locked:
+                filled = wait_for_fill(key, lambda entry: is_current(entry, stamp))
+                if filled is not None:
+                    return filled[2].to_response(request)
+                if entry is not None and isinstance(entry[2], CachedPage):
+                    return entry[2].to_response(request)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                if locked:
+                    release_fill_lock(key)
+                raise
+            add_cache_tags(response, tags)
+            if response.status_code != 200 or response.streaming:
+                if locked:
+                    release_fill_lock(key)
+                return response
+
+            def store(response):
+                fresh_until = time.time() + soft_timeout if soft_timeout else None
+                cache.set(key, (stamp, fresh_until, CachedPage(response)), timeout)
+                if locked:
+                    release_fill_lock(key)
+
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+
+        return _wrapper
+
+    return decorator
+
+
+def conditional_page(last_modified: Callable, versions: Iterable[str] = ()):
+    """
+    Answer conditional GETs with a 304 before anything is rendered.
+
+    ``last_modified(request, *args, **kwargs)`` returns when the content of
+    the page last changed, or None for a missing page. The change of the
+    given content ``versions`` counts as well, e.g. a deletion. The ETag
+    also depends on the path, the language and the versions.
+    """
+    versions = tuple(versions)
+
+    def last_modified_func(request, *args, **kwargs):
+        # Called for both validators, so it's computed once per request
+        if not hasattr(request, "_last_modified"):
+            modified = last_modified(request, *args, **kwargs)
+            if modified is not None and versions:
+                modified = max(modified, versions_modified(*versions))
+            request._last_modified = modified
+        return request._last_modified
+
+    def etag_func(request, *args, **kwargs):
+        modified = last_modified_func(request, *args, **kwargs)
+        if modified is None:
+            return None
+        current = get_versions(*versions) if versions else {}
+        parts = [request.path, get_language(), modified.isoformat()]
+        parts += [str(current[version]) for version in versions]
+        digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+        # Weak, the same page is served in several encodings
+        return f'W/"{digest.hexdigest()}"'
+
+    return condition(etag_func=etag_func, last_modified_func=last_modified_func)
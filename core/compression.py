@@ -0,0 +1,131 @@
+import gzip
+import re
+
+from django.http import HttpResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than these aren't worth the work
+MINIFY_MIN_LENGTH = 1024
+COMPRESS_MIN_LENGTH = 200
+
+# Cached pages are compressed once, so they get the best ratio
+BROTLI_QUALITY = 11
+BROTLI_QUALITY_DYNAMIC = 5
+GZIP_LEVEL = 9
+GZIP_LEVEL_DYNAMIC = 6
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+COMPRESSIBLE_TYPES = HTML_TYPES + (
+    "text/plain",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/ld+json",
+    "application/xml",
+    "text/xml",
+    "application/rss+xml",
+    "application/atom+xml",
+    "image/svg+xml",
+)
+
+ENCODINGS = {"br": re.compile(r"\bbr\b"), "gzip": re.compile(r"\bgzip\b")}
+AVAILABLE_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Content where whitespace matters (or that must be kept byte for byte, such
+# as JSON-LD and other scripts), and comments except conditional ones
+RE_PRESERVED = re.compile(
+    r"(<(pre|textarea|script)\b.*?</\2\s*>)|(<!--(?!\[if).*?-->)",
+    re.DOTALL | re.IGNORECASE,
+)
+RE_STYLE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.DOTALL | re.IGNORECASE)
+RE_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+RE_CSS_SPACE = re.compile(r"\s*([{};,>])\s*")
+RE_NEWLINE_SPACE = re.compile(r"\s*\n\s*")
+RE_SPACE = re.compile(r"[ \t\r\f\v]+")
+
+
+def minify_css(css: str) -> str:
+    css = RE_CSS_COMMENT.sub("", css)
+    css = RE_CSS_SPACE.sub(r"\1", css)
+    return RE_SPACE.sub(" ", RE_NEWLINE_SPACE.sub(" ", css)).strip()
+
+
+def collapse_whitespace(html: str) -> str:
+    # Browsers render any run of whitespace as a single space
+    html = RE_STYLE.sub(lambda m: m[1] + minify_css(m[2]) + m[3], html)
+    return RE_SPACE.sub(" ", RE_NEWLINE_SPACE.sub("\n", html))
+
+
+def minify_html(html: str) -> str:
+    """
+    Collapse whitespace and drop comments, keeping ``<pre>``, ``<textarea>``
+    and ``<script>`` elements (e.g. JSON-LD) exactly as they are
+    """
+    parts = []
+    position = 0
+    for match in RE_PRESERVED.finditer(html):
+        parts.append(collapse_whitespace(html[position : match.start()]))
+        if match[1]:
+            parts.append(match[1])
+        position = match.end()
+    parts.append(collapse_whitespace(html[position:]))
+    return "".join(parts).strip()
+
+
+def content_type(response: HttpResponse) -> str:
+    return response.get("Content-Type", "").split(";")[0].strip().lower()
+
+
+def minified_content(response: HttpResponse) -> bytes:
+    """
+    The body of ``response``, minified if it's HTML
+    """
+    if (
+        response.has_header("Content-Encoding")
+        or content_type(response) not in HTML_TYPES
+        or len(response.content) < MINIFY_MIN_LENGTH
+    ):
+        return response.content
+    html = response.content.decode(response.charset)
+    return minify_html(html).encode(response.charset)
+
+
+def minify_response(response: HttpResponse) -> None:
+    response.content = minified_content(response)
+    if response.has_header("Content-Length"):
+        response.headers["Content-Length"] = str(len(response.content))
+
+
+def compress(
+    content: bytes,
+    encodings=AVAILABLE_ENCODINGS,
+    quality: int = BROTLI_QUALITY,
+    level: int = GZIP_LEVEL,
+) -> dict[str, bytes]:
+    """
+    The encodings of ``content`` that are smaller than it, by name
+    """
+    if len(content) < COMPRESS_MIN_LENGTH:
+        return {}
+    bodies = {}
+    if "gzip" in encodings:
+        bodies["gzip"] = gzip.compress(content, compresslevel=level, mtime=0)
+    if "br" in encodings and brotli is not None:
+        bodies["br"] = brotli.compress(content, quality=quality)
+    return {name: body for name, body in bodies.items() if len(body) < len(content)}
+
+
+def accepted_encoding(request, available) -> str:
+    """
+    The preferred encoding out of ``available`` the client accepts, or ""
+    """
+    accept = request.headers.get("Accept-Encoding", "")
+    for name, pattern in ENCODINGS.items():
+        if name in available and pattern.search(accept):
+            return name
+    return ""
@@ -1,42 +1,66 @@
 import json
+from functools import lru_cache
 
 from django.conf import settings
+from django.utils import translation
+from django.utils.encoding import escape_uri_path
 from django.utils.translation import get_language
 from django.utils.translation import gettext as _
 
+BRAND_EMOJI = "🍳"
+BRAND_NAME = "Khadija Recipes"
 
-def brand(request):
-    emoji = "🍳"
-    name = "Khadija Recipes"
-    description = _(
-        "homemade Moroccan specialties and creative recipes from Bern. "
-        "Discover traditional sweets or try new recipes at home."
-    )
+
+@lru_cache(maxsize=16)
+def brand_description(lang: str) -> str:
+    with translation.override(lang):
+        return _(
+            "homemade Moroccan specialties and creative recipes from Bern. "
+            "Discover traditional sweets or try new recipes at home."
+        )
+
+
+@lru_cache(maxsize=64)
+def website_schema(lang: str, site_url: str) -> str:
+    """WebSite structured data, memoized per language and website URL"""
     schema = {
         "@context": "https://schema.org",
         "@type": "WebSite",
-        "url": request.build_absolute_uri(),
-        "name": name,
-        "description": description,
-        "inLanguage": request.LANGUAGE_CODE,
+        "url": site_url,
+        "name": BRAND_NAME,
+        "description": brand_description(lang),
+        "inLanguage": lang,
         "publisher": {"@type": "Person", "name": "Khadija El Azzouzi"},
     }
-    return {
-        "request": request,
-        "brand_name": name,
-        "brand_emoji": emoji,
-        "page_description": description,  # will be overriden on views (hopefully)
-        "website_schema": json.dumps(schema, ensure_ascii=True),
-    }
+    return json.dumps(schema, ensure_ascii=True)
 
 
-def links(request):
-    lang = get_language()
+@lru_cache(maxsize=16)
+def site_links(lang: str) -> dict[str, str]:
     return {
-        "request": request,
         "website_url": settings.WEBSITE_URL,
         "whatsapp_url": settings.WHATSAPP_URL,
         "telegram_url": settings.TELEGRAM_URL,
         "instagram_url": settings.INSTAGRAM_URL,
         "temp_blog_url": f"https://khadijarecipes.com/{lang}/blog/",
     }
+
+
+def brand(request):
+    lang = get_language()
+    return {
+        "request": request,
+        "brand_name": BRAND_NAME,
+        "brand_emoji": BRAND_EMOJI,
+        "page_description": brand_description(lang),  # will be overriden on views
+        # Absolute URLs don't depend on the request host, pages are cached
+        # once for every host
+        "page_url": settings.WEBSITE_URL + escape_uri_path(request.path),
+        "page_cache_timeout": settings.PAGE_CACHE_TIMEOUT,
+        # Templates call it, so it's only serialized where it's used
+        "website_schema": lambda: website_schema(lang, settings.WEBSITE_URL + "/"),
+    }
+
+
+def links(request):
+    return {"request": request, **site_links(get_language())}
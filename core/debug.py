@@ -0,0 +1,118 @@
+import os
+import re
+import sys
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries: int):
+    """
+    Declare how many queries a view may run to render its page, template
+    included. The budget is only checked with DEBUG, where an overrun
+    raises with the list of queries.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapper(request, *args, **kwargs):
+            if not settings.DEBUG:
+                return view_func(request, *args, **kwargs)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render") and callable(response.render):
+                    response.render()
+            if len(queries) > max_queries:
+                sql = "\n".join(query["sql"] for query in queries.captured_queries)
+                raise QueryBudgetExceeded(
+                    f"{request.path} ran {len(queries)} queries, "
+                    f"its budget is {max_queries}:\n{sql}"
+                )
+            return response
+
+        return _wrapper
+
+    return decorator
+
+
+class NPlusOneDetected(Exception):
+    pass
+
+
+# Lists of parameters, which vary in length from one query to the next
+RE_PARAM_LIST = re.compile(r"\((?:%s, )*%s\)")
+RE_TABLE = re.compile(r'FROM "(\w+)"')
+
+# Frames of the detector itself are never the origin of a query
+DETECTOR_FILES = {__file__, os.path.join(os.path.dirname(__file__), "middleware.py")}
+
+
+def query_origin() -> str:
+    """
+    Where the current query comes from: the innermost template node being
+    rendered and the innermost frame of the project's own code
+    """
+    template = code = None
+    frame = sys._getframe(1)
+    while frame and not (template and code):
+        if template is None and frame.f_code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin and token:
+                name = origin.template_name or origin.name
+                template = f"{name}:{token.lineno}"
+        filename = frame.f_code.co_filename
+        if (
+            code is None
+            and filename.startswith(str(settings.BASE_DIR))
+            and "-packages" not in filename
+            and filename not in DETECTOR_FILES
+        ):
+            path = os.path.relpath(filename, settings.BASE_DIR)
+            code = f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ", ".join(filter(None, [template, code])) or "unknown"
+
+
+class QueryRepeatDetector:
+    """
+    Execute wrapper that counts the queries of a request by shape (the SQL
+    without its parameters) and remembers where a shape starts to repeat
+    """
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = RE_PARAM_LIST.sub("(...)", sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1:
+            self.origins[shape] = query_origin()
+        return execute(sql, params, many, context)
+
+    def repeated(self) -> list[tuple[str, int, str]]:
+        """Shapes run more than ``threshold`` times, with count and origin"""
+        return [
+            (shape, count, self.origins[shape])
+            for shape, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+    def summary(self) -> str:
+        """One line per repeated shape, e.g. for a response header"""
+        lines = []
+        for shape, count, origin in self.repeated():
+            table = match[1] if (match := RE_TABLE.search(shape)) else "?"
+            lines.append(f"{count}x {table} at {origin}")
+        return "; ".join(lines)
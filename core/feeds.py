@@ -1,12 +1,40 @@
+from datetime import date, datetime, time, timedelta
+
 from django.contrib.syndication.views import Feed
+from django.db.models import Max, Q
 from django.utils import timezone
-from django.utils.translation import activate
 from django.utils.translation import gettext_lazy as _
 
 from products.models import Product
 from recipes.models import Recipe
 
-activate("de")
+# The feeds list the items created in the last days, counted in whole days
+# so that a feed only changes at midnight when nothing is saved
+FEED_DAYS = 30
+
+
+def midnight(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def window_start(day: date) -> datetime:
+    """Items created since then are in the feeds of ``day``"""
+    return midnight(day - timedelta(days=FEED_DAYS))
+
+
+def feed_last_modified(model, day: date) -> datetime | None:
+    """
+    Last change of a feed of ``day``: an item was saved, or left the
+    window at midnight
+    """
+    dates = model.objects.aggregate(
+        saved=Max("updated_at"),
+        left=Max("created_at", filter=Q(created_at__lt=window_start(day))),
+    )
+    if dates["left"] is not None:
+        left_on = timezone.localdate(dates["left"]) + timedelta(days=FEED_DAYS + 1)
+        dates["left"] = midnight(left_on)
+    return max((value for value in dates.values() if value), default=None)
 
 
 class ProductPinFeed(Feed):
@@ -15,12 +43,16 @@ class ProductPinFeed(Feed):
     description = _("Last products published in my website")
     item_enclosure_mime_type = "image/png"
 
-    def items(self):
-        past = timezone.now() - timezone.timedelta(days=30)
-        return Product.objects.filter(
-            created_at__gte=past,
-            productimage__isnull=False,
-        ).distinct()
+    def get_object(self, request, day: date):
+        return day
+
+    def items(self, day: date):
+        return (
+            Product.objects.filter(created_at__gte=window_start(day))
+            .with_images()
+            .with_first_image()
+            .localized("title", "slug", "description")
+        )
 
     def item_title(self, item: Product):
         return item.title
@@ -32,10 +64,10 @@ class ProductPinFeed(Feed):
         return item.updated_at
 
     def item_enclosure_url(self, item: Product):
-        return item.productimage_set.first().image.url
+        return item.first_image.image.url
 
     def item_enclosure_length(self, item: Product):
-        return item.productimage_set.first().image.size
+        return item.first_image.image.size
 
 
 class RecipePinFeed(Feed):
@@ -44,12 +76,15 @@ class RecipePinFeed(Feed):
     description = _("Last recipes published in my website")
     item_enclosure_mime_type = "image/png"
 
-    def items(self):
-        past = timezone.now() - timezone.timedelta(days=30)
+    def get_object(self, request, day: date):
+        return day
+
+    def items(self, day: date):
         return (
-            Recipe.objects.filter(created_at__gte=past)
+            Recipe.objects.filter(created_at__gte=window_start(day))
             .exclude(main_image="")
             .distinct()
+            .localized("title", "slug", "introduction")
         )
 
     def item_title(self, item: Recipe):
@@ -0,0 +1,82 @@
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import resolve
+from django.utils import translation
+
+from core.cache import page_request
+from core.compression import compress, minified_content
+
+from .warmcache import public_paths
+
+
+class Command(BaseCommand):
+    help = "Show the bytes saved by minification and compression per page type"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            action="append",
+            choices=settings.LANGUAGE_CODES,
+            help="Only render this language (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        langs = options["language"] or settings.LANGUAGE_CODES
+        stats = defaultdict(lambda: defaultdict(float))
+
+        for lang in langs:
+            for path in public_paths(lang):
+                page_type, response = self.render(path, lang)
+                if response.status_code != 200:
+                    self.stderr.write(f"✗ {lang} {path}: {response.status_code}")
+                    continue
+                start = time.perf_counter()
+                content = minified_content(response)
+                bodies = compress(content)
+                elapsed = (time.perf_counter() - start) * 1000
+
+                row = stats[page_type]
+                row["pages"] += 1
+                row["raw"] += len(response.content)
+                row["minified"] += len(content)
+                row["gzip"] += len(bodies.get("gzip", content))
+                row["br"] += len(bodies.get("br", content))
+                row["ms"] += elapsed
+
+        self.width = max(len(page_type) for page_type in stats) if stats else 10
+        header = f"{'page type':<{self.width}} {'pages':>5} {'raw':>9} {'minified':>9} "
+        header += f"{'gzip':>9} {'br':>9} {'saved':>6} {'ms/page':>8}"
+        self.stdout.write(header)
+        totals = defaultdict(float)
+        for page_type, row in sorted(stats.items()):
+            self.stdout.write(self.format_row(page_type, row))
+            for name, value in row.items():
+                totals[name] += value
+        if totals:
+            self.stdout.write(self.style.SUCCESS(self.format_row("total", totals)))
+
+    def render(self, path: str, lang: str):
+        # The view is called without the middleware, to get the raw body
+        with translation.override(lang):
+            request = page_request(path, lang, refresh=True)
+            match = resolve(request.path_info)
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response.render()
+        return match.url_name, response
+
+    def format_row(self, page_type: str, row: dict) -> str:
+        best = min(row["gzip"], row["br"])
+        saved = 1 - best / row["raw"] if row["raw"] else 0
+        return (
+            f"{page_type:<{self.width}} {row['pages']:>5.0f} {self.kb(row['raw']):>9} "
+            f"{self.kb(row['minified']):>9} {self.kb(row['gzip']):>9} "
+            f"{self.kb(row['br']):>9} {saved:>6.0%} "
+            f"{row['ms'] / row['pages']:>8.1f}"
+        )
+
+    def kb(self, size: float) -> str:
+        return f"{size / 1024:.1f} KB"
@@ -0,0 +1,107 @@
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import translation
+
+from products.models import Product
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the queries of the pages in reader threads against writer "
+        "threads like the huey tasks, and report throughput, latency and "
+        "lock errors"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--duration", type=float, default=10, help="In seconds (default 10)"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("This benchmark is made for SQLite")
+        self.recipe_ids = list(Recipe.objects.values_list("pk", flat=True))
+        if not self.recipe_ids:
+            raise CommandError("There are no recipes to read and write")
+
+        with connection.cursor() as cursor:
+            for name in settings.SQLITE_PRAGMAS:
+                cursor.execute(f"PRAGMA {name}")
+                self.stdout.write(f"{name} = {cursor.fetchone()[0]}")
+
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        deadline = time.monotonic() + options["duration"]
+        threads = [
+            threading.Thread(target=self.run, args=(kind, work, deadline))
+            for kind, work, count in (
+                ("read", self.read, options["readers"]),
+                ("write", self.write, options["writers"]),
+            )
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.stdout.write(
+            f"{'':<6} {'ops':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'max ms':>8} {'errors':>7}"
+        )
+        for kind in ("read", "write"):
+            self.stdout.write(self.format_row(kind, options["duration"]))
+        if any(self.errors.values()):
+            raise CommandError(f"{sum(self.errors.values())} operations failed")
+
+    def run(self, kind: str, work, deadline: float) -> None:
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    work()
+                except OperationalError as err:
+                    self.stderr.write(f"✗ {kind}: {err}")
+                    self.errors[kind] += 1
+                    continue
+                self.latencies[kind].append(time.perf_counter() - start)
+        finally:
+            # Each thread has its own connection
+            connection.close()
+
+    def read(self) -> None:
+        """The queries of the home page and of a recipe page"""
+        with translation.override(random.choice(settings.LANGUAGE_CODES)):
+            products = Product.objects.with_images().with_first_image()
+            list(products.localized("title", "slug"))
+            Recipe.objects.with_details().get(pk=random.choice(self.recipe_ids))
+
+    def write(self) -> None:
+        """A write like the JSON-LD task, which leaves the row unchanged"""
+        with transaction.atomic():
+            recipes = Recipe.objects.filter(pk=random.choice(self.recipe_ids))
+            recipes.update(json_schemas=F("json_schemas"))
+
+    def format_row(self, kind: str, duration: float) -> str:
+        latencies = sorted(self.latencies[kind])
+        errors = self.errors[kind]
+        if len(latencies) < 2:
+            empty = " ".join([f"{'-':>8}"] * 4)
+            return f"{kind:<6} {len(latencies):>7} {empty} {errors:>7}"
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        return (
+            f"{kind:<6} {len(latencies):>7} {len(latencies) / duration:>8.0f} "
+            f"{statistics.median(latencies) * 1000:>8.1f} {p95 * 1000:>8.1f} "
+            f"{latencies[-1] * 1000:>8.1f} {errors:>7}"
+        )
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.cache import render_page
+
+from .warmcache import public_paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every public page and run EXPLAIN QUERY PLAN on its queries, "
+        "failing when a filtered query scans a whole table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            default=settings.LANGUAGE_CODE,
+            choices=settings.LANGUAGE_CODES,
+        )
+        parser.add_argument(
+            "--allow",
+            action="append",
+            default=[],
+            metavar="TABLE",
+            help="Accept full scans of this table (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("EXPLAIN QUERY PLAN is only supported on SQLite")
+
+        lang = options["language"]
+        scans = 0
+        failed = 0
+        checked = set()
+
+        for path in public_paths(lang):
+            with CaptureQueriesContext(connection) as queries:
+                response = render_page(path, lang, refresh=True)
+            if response.status_code != 200:
+                self.stderr.write(self.style.ERROR(f"✗ {path}: {response.status_code}"))
+                failed += 1
+                continue
+
+            for query in queries.captured_queries:
+                sql = query["sql"]
+                if not sql.startswith("SELECT") or sql in checked:
+                    continue
+                checked.add(sql)
+                for problem, is_scan in self.explain(sql, options["allow"]):
+                    scans += is_scan
+                    style = self.style.ERROR if is_scan else self.style.WARNING
+                    self.stdout.write(style(f"{path}: {problem}"))
+                    self.stdout.write(f"  {sql[:300]}")
+
+        summary = f"Checked {len(checked)} queries"
+        errors = []
+        if scans:
+            errors.append(f"{scans} scan a whole table")
+        if failed:
+            errors.append(f"{failed} pages failed to render")
+        if errors:
+            raise CommandError(", ".join([summary, *errors]))
+        self.stdout.write(self.style.SUCCESS(f"{summary}, no full table scan"))
+
+    def explain(self, sql: str, allowed: list[str]):
+        """
+        Yield the problems of the plan of ``sql``, and whether each one is
+        a full table scan. Scans are expected for unfiltered queries and for
+        filters on a correlated subquery (e.g. ``Exists``), which need every row.
+        Scans of subqueries and CTEs (e.g. ``qualify`` of a sliced
+        ``Prefetch``) read rows their own plan already found.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            details = [row[-1] for row in cursor.fetchall()]
+        filtered = " WHERE " in sql and not any(
+            detail.startswith("CORRELATED") for detail in details
+        )
+        derived = {
+            detail.split(" ", 1)[1]
+            for detail in details
+            if detail.startswith(("CO-ROUTINE ", "MATERIALIZE "))
+        }
+        for detail in details:
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                table = detail.split()[1]
+                if table in derived or table.startswith("(subquery-"):
+                    continue
+                if filtered and table not in allowed:
+                    yield detail, True
+            elif "USE TEMP B-TREE FOR ORDER BY" in detail:
+                yield detail, False
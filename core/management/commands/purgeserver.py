@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.purge import PurgeServer
+
+
+class Command(BaseCommand):
+    help = "Run a local stand-in for the purge API of an edge cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+
+    def handle(self, *args, **options):
+        server = PurgeServer(
+            (options["host"], options["port"]),
+            on_purge=lambda tags: self.stdout.write(f"Purged {' '.join(tags)}"),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Listening on {server.url}, use it as PURGE_URL")
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.urls import reverse
+from django.utils import translation
+
+from core.cache import render_page
+from products.models import Product
+from recipes.models import Recipe
+
+
+def public_paths(lang: str) -> list[str]:
+    """Paths of every public page in the given language"""
+    with translation.override(lang):
+        paths = [
+            reverse("home"),
+            reverse("privacy"),
+            reverse("terms"),
+            reverse("robots"),
+            reverse("django.contrib.sitemaps.views.sitemap"),
+            reverse("product_feed_pins", args=(lang,)),
+            reverse("recipe_feed_pins", args=(lang,)),
+            reverse("recipe_list"),
+        ]
+        paths += [str(recipe.url) for recipe in Recipe.objects.all()]
+        paths += [str(product.url) for product in Product.objects.all()]
+    return paths
+
+
+class Command(BaseCommand):
+    help = "Render every public page in all languages into the cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of pages rendered at the same time",
+        )
+        parser.add_argument(
+            "--language",
+            action="append",
+            choices=settings.LANGUAGE_CODES,
+            help="Only warm this language (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        langs = options["language"] or settings.LANGUAGE_CODES
+        jobs = [(path, lang) for lang in langs for path in public_paths(lang)]
+        total = len(jobs)
+        failed = 0
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            futures = {executor.submit(self.warm, *job): job for job in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path, lang = futures[future]
+                try:
+                    status, elapsed = future.result()
+                except Exception as e:
+                    status, elapsed = repr(e), 0
+                if status != 200:
+                    failed += 1
+                    self.stderr.write(f"[{done}/{total}] ✗ {lang} {path}: {status}")
+                else:
+                    self.stdout.write(
+                        f"[{done}/{total}] ✓ {lang} {path} ({elapsed:.0f} ms)"
+                    )
+
+        elapsed = time.perf_counter() - start
+        summary = f"Warmed {total - failed}/{total} pages in {elapsed:.1f}s"
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    def warm(self, path: str, lang: str) -> tuple[int, float]:
+        start = time.perf_counter()
+        try:
+            response = render_page(path, lang, refresh=True)
+        finally:
+            # Each thread opened its own database connection
+            connections.close_all()
+        return response.status_code, (time.perf_counter() - start) * 1000
@@ -1,4 +1,25 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.http import HttpResponsePermanentRedirect
+from django.utils.cache import patch_vary_headers
+
+from .compression import (
+    AVAILABLE_ENCODINGS,
+    BROTLI_QUALITY_DYNAMIC,
+    COMPRESSIBLE_TYPES,
+    GZIP_LEVEL_DYNAMIC,
+    accepted_encoding,
+    compress,
+    content_type,
+    minify_response,
+)
+from .debug import NPlusOneDetected, QueryRepeatDetector
+
+logger = logging.getLogger(__name__)
 
 try:
     # Try built-in redirect model
@@ -44,3 +65,71 @@ class PageRedirectMiddleware:
             return HttpResponsePermanentRedirect(new_url)
 
         return response
+
+
+class CompressionMiddleware:
+    """
+    Minify HTML responses and compress them with brotli or gzip.
+
+    Cached pages are already minified and compressed, so this only works
+    on responses rendered for the request. Keep it above the middleware
+    that reads or changes the response body (like ``GZipMiddleware``).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if content_type(response) not in COMPRESSIBLE_TYPES:
+            return response
+
+        minify_response(response)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not (encoding := accepted_encoding(request, AVAILABLE_ENCODINGS)):
+            return response
+        bodies = compress(
+            response.content, (encoding,), BROTLI_QUALITY_DYNAMIC, GZIP_LEVEL_DYNAMIC
+        )
+        if encoding in bodies:
+            response.content = bodies[encoding]
+            response.headers["Content-Length"] = str(len(response.content))
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Flag the SQL shapes that run more than NPLUSONE_THRESHOLD times in a
+    request, which is usually a query in a loop (N+1). The report names the
+    template line and the code that ran them. It's logged, sent in the
+    X-NPlusOne header and, with NPLUSONE_RAISE, raised.
+
+    Only active with NPLUSONE_DETECTOR, e.g. in development and staging.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_DETECTOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = QueryRepeatDetector(settings.NPLUSONE_THRESHOLD)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            response = self.get_response(request)
+
+        if not (repeated := detector.repeated()):
+            return response
+        report = "\n".join(
+            f"{count}x {origin}: {shape}" for shape, count, origin in repeated
+        )
+        logger.warning("N+1 queries on %s\n%s", request.path, report)
+        if settings.NPLUSONE_RAISE:
+            raise NPlusOneDetected(f"N+1 queries on {request.path}\n{report}")
+        response.headers["X-NPlusOne"] = detector.summary()
+        return response
@@ -0,0 +1,109 @@
+# Generated by Django 6.1.2 on 2026-10-18 11:04
+
+import django.db.models.deletion
+from django.db import IntegrityError, migrations, models
+
+# The languages when this migration was written
+LANGUAGE_CODES = ["de", "en", "es", "fr", "it"]
+
+
+def build_slug_index(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    SlugIndex = apps.get_model("core", "SlugIndex")
+    entries = []
+    conflicts = []
+    for app_label, model_name in [("recipes", "Recipe"), ("products", "Product")]:
+        model = apps.get_model(app_label, model_name)
+        content_type, _ = ContentType.objects.get_or_create(
+            app_label=app_label, model=model_name.lower()
+        )
+        pages = {}
+        for obj in model.objects.order_by("pk"):
+            for lang in LANGUAGE_CODES:
+                slug = getattr(obj, f"slug_{lang}")
+                if not slug:
+                    continue
+                if (lang, slug) in pages:
+                    conflicts.append(
+                        f"{model_name} {pages[lang, slug]} and {obj.pk}: "
+                        f"slug_{lang} {slug!r}"
+                    )
+                    continue
+                pages[lang, slug] = obj.pk
+                entries.append(
+                    SlugIndex(
+                        content_type=content_type,
+                        object_id=obj.pk,
+                        language=lang,
+                        slug=slug,
+                    )
+                )
+    if conflicts:
+        # Only one of them could be found by its slug, rename the other first
+        raise IntegrityError(
+            "Pages share a slug in the same language:\n" + "\n".join(conflicts)
+        )
+    SlugIndex.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("core", "0002_faq_delete_dummymodel"),
+        ("products", "0012_rename_alt_de_productimage_alt_text_de_and_more"),
+        ("recipes", "0011_recipe_json_schemas"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlugIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("slug", models.SlugField(db_index=False, max_length=256)),
+                (
+                    "language",
+                    models.CharField(
+                        choices=[
+                            ("de", "German"),
+                            ("en", "English"),
+                            ("es", "Spanish"),
+                            ("fr", "French"),
+                            ("it", "Italian"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "object_id"],
+                        name="core_slugin_content_eb46df_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("content_type", "slug", "language"),
+                        name="unique_slug_per_language",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(build_slug_index, migrations.RunPython.noop),
+    ]
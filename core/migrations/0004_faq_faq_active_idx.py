@@ -0,0 +1,20 @@
+# Generated by Django 6.1.2 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_slugindex"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="faq",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["created_at"],
+                name="faq_active_idx",
+            ),
+        ),
+    ]
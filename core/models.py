@@ -1,6 +1,18 @@
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
-from config.db import CustomModel
+from config.db import CustomModel, LocalizedQuerySet
+
+
+class FaqQuerySet(LocalizedQuerySet):
+    def active(self):
+        """
+        The published FAQs. Views pass them unevaluated, the templates
+        render them in a fragment cached per version of the FAQs.
+        """
+        return self.filter(is_active=True).localized("question", "answer")
 
 
 class Faq(CustomModel):
@@ -16,6 +28,17 @@ class Faq(CustomModel):
     answer_it = models.TextField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
 
+    objects = FaqQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_active=True),
+                name="faq_active_idx",
+            ),
+        ]
+
     @property
     def question(self):
         return self.get_localized_value("question") or self.question_de
@@ -23,3 +46,28 @@ class Faq(CustomModel):
     @property
     def answer(self):
         return self.get_localized_value("answer") or self.answer_de
+
+
+class SlugIndex(models.Model):
+    """
+    The slugs of every page in every language, kept up to date by
+    ``PageModel.save``, so a page is found by its slug with one indexed query
+    """
+
+    slug = models.SlugField(max_length=256, db_index=False)
+    language = models.CharField(max_length=8, choices=settings.LANGUAGES)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey("content_type", "object_id")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "slug", "language"],
+                name="unique_slug_per_language",
+            ),
+        ]
+        indexes = [models.Index(fields=["content_type", "object_id"])]
+
+    def __str__(self):
+        return f"{self.slug} ({self.language})"
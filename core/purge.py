@@ -0,0 +1,144 @@
+import json
+import logging
+import threading
+import urllib.request
+from collections.abc import Iterable
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from config.db import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+
+def add_cache_tags(response, tags: Iterable[str]) -> None:
+    """
+    Tag a response for an edge cache, so it can be purged by tag later.
+    ``Surrogate-Key`` is read by Fastly and Varnish, ``Cache-Tag`` by
+    Cloudflare and others.
+    """
+    tags = list(dict.fromkeys(tags))
+    if not tags:
+        return
+    response.headers["Surrogate-Key"] = " ".join(tags)
+    response.headers["Cache-Tag"] = ",".join(tags)
+
+
+class BasePurgeBackend:
+    """
+    Purges edge cache entries by tag. Raise on failure, the call is retried.
+    """
+
+    def purge(self, tags: list[str]) -> None:
+        raise NotImplementedError
+
+
+class DummyPurgeBackend(BasePurgeBackend):
+    """Used when there is no edge cache"""
+
+    def purge(self, tags: list[str]) -> None:
+        pass
+
+
+class HTTPPurgeBackend(BasePurgeBackend):
+    """
+    POSTs ``{"tags": [...]}`` to PURGE_URL, which is the body of the purge
+    API of Cloudflare. PURGE_TOKEN is sent as a bearer token.
+    """
+
+    def __init__(self, url: str, token: str = "", timeout: int = 10):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def purge(self, tags: list[str]) -> None:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"tags": tags}).encode(),
+            headers=headers,
+            method="POST",
+        )
+        # Raises for error statuses too
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def get_backend() -> BasePurgeBackend:
+    backend = import_string(settings.PURGE_BACKEND)
+    if issubclass(backend, HTTPPurgeBackend):
+        return backend(settings.PURGE_URL, settings.PURGE_TOKEN)
+    return backend()
+
+
+def purge_tags(tags: Iterable[str]) -> None:
+    """
+    Purge the edge cache once the current transaction is committed.
+    All tags of a transaction are sent together, in batches.
+    """
+    connection = transaction.get_connection()
+    if not hasattr(connection, "pending_purge_tags"):
+        connection.pending_purge_tags = set()
+    connection.pending_purge_tags.update(tags)
+    on_commit_once("purge_tags", partial(flush_purge_tags, connection))
+
+
+def flush_purge_tags(connection) -> None:
+    from .tasks import task_purge_tags
+
+    tags = sorted(connection.pending_purge_tags)
+    connection.pending_purge_tags.clear()
+    size = settings.PURGE_BATCH_SIZE
+    for start in range(0, len(tags), size):
+        task_purge_tags(tags[start : start + size])
+
+
+class PurgeRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        tags = json.loads(body)["tags"]
+        self.server.record(tags)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"success": true}')
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class PurgeServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the purge API of an edge cache, which records every
+    call in ``purged``. Use it as a context manager in tests, or run it with
+    ``manage.py purgeserver``.
+    """
+
+    def __init__(self, address=("127.0.0.1", 0), on_purge=None):
+        super().__init__(address, PurgeRequestHandler)
+        self.purged = []
+        self.on_purge = on_purge
+
+    def record(self, tags: list[str]) -> None:
+        self.purged.append(tags)
+        if self.on_purge:
+            self.on_purge(tags)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/purge"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,18 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.db import configure_sqlite
+from core.cache import bump_version
+from core.models import Faq
+
+
+@receiver([post_save, post_delete], sender=Faq)
+def bump_faqs_version(sender, instance: Faq, **kwargs):
+    bump_version("faqs")
+
+
+@receiver(connection_created)
+def configure_database_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        configure_sqlite(connection)
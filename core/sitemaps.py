@@ -1,10 +1,24 @@
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
 
 from products.models import Product
 from recipes.models import Recipe
 
 
-class RecipeSitemap(Sitemap):
+class PageSitemap(Sitemap):
+    """With language prefixed urls every page lists its other languages"""
+
+    @property
+    def i18n(self):
+        return settings.LANGUAGE_URL_PREFIX
+
+    @property
+    def alternates(self):
+        return settings.LANGUAGE_URL_PREFIX
+
+
+class RecipeSitemap(PageSitemap):
     changefreq = "yearly"
     priority = 0.7
 
@@ -12,10 +26,14 @@ class RecipeSitemap(Sitemap):
         return Recipe.objects.all()
 
     def lastmod(self, obj: Recipe):
-        obj.updated_at
+        return obj.updated_at
 
+    def location(self, obj: Recipe):
+        # URLs are lazy, they must be built in the language of the alternate
+        return str(obj.url)
 
-class ProductSitemap(Sitemap):
+
+class ProductSitemap(PageSitemap):
     changefreq = "monthly"
     priority = 0.9
 
@@ -23,4 +41,16 @@ class ProductSitemap(Sitemap):
         return Product.objects.all()
 
     def lastmod(self, obj: Product):
-        obj.updated_at
+        return obj.updated_at
+
+    def location(self, obj: Product):
+        # URLs are lazy, they must be built in the language of the alternate
+        return str(obj.url)
+
+
+def sitemap_last_modified(request, **kwargs):
+    dates = [
+        Recipe.objects.aggregate(Max("updated_at"))["updated_at__max"],
+        Product.objects.aggregate(Max("updated_at"))["updated_at__max"],
+    ]
+    return max((date for date in dates if date), default=None)
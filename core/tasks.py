@@ -1,8 +1,29 @@
 from django.core.management import call_command
+from django.db import connection
 from huey import crontab
-from huey.contrib.djhuey import periodic_task
+from huey.contrib.djhuey import db_periodic_task, db_task, periodic_task, task
+
+from config.db import optimize_sqlite
+from core.cache import render_page
+from core.purge import get_backend
 
 
 @periodic_task(crontab(hour="0", minute="0"))
 def task_generate_images():
     call_command("generateimages")
+
+
+@db_periodic_task(crontab(hour="3", minute="30"))
+def task_optimize_database():
+    if connection.vendor == "sqlite":
+        optimize_sqlite(connection)
+
+
+@db_task()
+def task_refresh_page(path: str, lang: str):
+    render_page(path, lang, refresh=True)
+
+
+@task(retries=5, retry_delay=30)
+def task_purge_tags(tags: list[str]):
+    get_backend().purge(tags)
@@ -1 +1,643 @@
-# Create your tests here.
+import gzip
+import importlib
+import io
+import re
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.conf.urls.i18n import is_language_prefix_patterns_used
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.template import loader
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone, translation
+from huey.contrib.djhuey import HUEY
+from PIL import Image
+
+from core.cache import (
+    CachedPage,
+    acquire_fill_lock,
+    cache_object_page,
+    get_versions,
+    invalidate_pages,
+    page_cache_key,
+    page_version,
+    version_cache_key,
+)
+from core.compression import (
+    COMPRESS_MIN_LENGTH,
+    GZIP_LEVEL_DYNAMIC,
+    MINIFY_MIN_LENGTH,
+    compress,
+    minified_content,
+    minify_html,
+)
+from core.debug import (
+    NPlusOneDetected,
+    QueryBudgetExceeded,
+    QueryRepeatDetector,
+    query_budget,
+)
+from core.feeds import FEED_DAYS
+from core.management.commands.warmcache import public_paths
+from core.middleware import CompressionMiddleware, NPlusOneMiddleware
+from core.models import Faq
+from core.views import HomeView
+from products.models import Product, ProductImage, ProductType
+from products.views import ProductDetailView
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeStep, Unit
+from recipes.views import RecipeDetailView, RecipeListView
+
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+TEST_STORAGES = {
+    **settings.STORAGES,
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+}
+
+LANGUAGE_NAMES = {"de": "Teller", "en": "Plate", "fr": "Assiette", "es": "Plato"}
+
+
+def image_file(name: str) -> ContentFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 600), "orange").save(buffer, "JPEG")
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+def translated(prefix: str, field: str, number: int) -> dict[str, str]:
+    """
+    A value of ``field`` in every language but Italian, which falls back to
+    German, e.g. ``{"title_de": "Teller recipe 1", ...}``
+    """
+    return {
+        f"{field}_{lang}": f"{name} {prefix} {number}"
+        for lang, name in LANGUAGE_NAMES.items()
+    }
+
+
+def reload_urlconf() -> None:
+    """Build the URLconf again for the current settings"""
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+    is_language_prefix_patterns_used.cache_clear()
+
+
+def seed_catalog(products: int = 6, recipes: int = 6, faqs: int = 4) -> None:
+    """A catalog like the one in production, only smaller"""
+    for number in range(faqs):
+        Faq.objects.create(
+            **translated("question", "question", number),
+            **translated("answer", "answer", number),
+        )
+    units = [
+        Unit.objects.create(abbreviation="g", name_de="Gramm", name_plural_de="Gramm"),
+        Unit.objects.create(name_de="Tasse", name_plural_de="Tassen"),
+    ]
+    ingredients = [
+        Ingredient.objects.create(name_de=name, name_plural_de=name)
+        for name in ("Mehl", "Zucker", "Datteln")
+    ]
+    for number in range(products):
+        product = Product.objects.create(
+            **translated("product", "title", number),
+            **translated("description", "description", number),
+            product_type=ProductType.SWEET_PLATTERS,
+            total_fat=10,
+            total_carbo=50,
+            protein=8,
+            price_500g=12,
+        )
+        for position in range(3):
+            ProductImage.objects.create(
+                product=product,
+                image=image_file(f"product-{number}-{position}.jpg"),
+                **translated("image", "alt_text", position),
+            )
+    for number in range(recipes):
+        recipe = Recipe.objects.create(
+            **translated("recipe", "title", number),
+            **translated("introduction", "introduction", number),
+            prep_time=20,
+            cook_time=40,
+            main_image=image_file(f"recipe-{number}.jpg"),
+        )
+        for position, ingredient in enumerate(ingredients):
+            RecipeIngredient.objects.create(
+                recipe=recipe,
+                ingredient=ingredient,
+                quantity=position + 1,
+                unit=units[position % len(units)],
+            )
+        for step_number in range(1, 5):
+            RecipeStep.objects.create(
+                recipe=recipe,
+                step_number=step_number,
+                **translated("step", "instruction", step_number),
+            )
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    STORAGES=TEST_STORAGES,
+    PURGE_BACKEND="core.purge.DummyPurgeBackend",
+)
+class PublicPageTestCase(TestCase):
+    """
+    Seeds a catalog and checks the public pages in every language against
+    a query and time budget, so regressions fail here and not in production.
+
+    The time ceilings are generous, they catch a page that becomes an order
+    of magnitude slower rather than small variations between machines.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Tasks (JSON-LD, purges, cache refreshes) run in the test
+        cls.huey_immediate = HUEY.immediate
+        HUEY.immediate = True
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        HUEY.immediate = cls.huey_immediate
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            seed_catalog()
+
+    def setUp(self):
+        cache.clear()
+
+    def page_paths(self, url_name: str) -> list[tuple[str, str]]:
+        """The public paths of ``url_name`` in every language"""
+        paths = []
+        for lang in settings.LANGUAGE_CODES:
+            # Prefixed paths only resolve in their language
+            with translation.override(lang):
+                paths += [
+                    (path, lang)
+                    for path in public_paths(lang)
+                    if resolve(unquote(path)).url_name == url_name
+                ]
+        self.assertTrue(paths, f"No public page named {url_name}")
+        return paths
+
+    def get_page(self, path: str, lang: str, max_queries: int, max_seconds: float):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.client.get(path, HTTP_ACCEPT_LANGUAGE=lang)
+            elapsed = time.perf_counter() - start
+        self.assertEqual(response.status_code, 200, f"{path} ({lang})")
+        self.assertLessEqual(
+            len(queries),
+            max_queries,
+            f"{path} ({lang}) ran {len(queries)} queries:\n"
+            + "\n".join(query["sql"] for query in queries.captured_queries),
+        )
+        self.assertLess(
+            elapsed, max_seconds, f"{path} ({lang}) took {elapsed:.3f} seconds"
+        )
+        return response
+
+    def assertPageBudget(
+        self,
+        url_name: str,
+        queries: int,
+        seconds: float = 1.0,
+        cached_queries: int = 0,
+        cached_seconds: float = 0.1,
+    ):
+        """
+        Request every page of ``url_name`` in every language twice: rendered
+        and then from the page cache, each within its own budget
+        """
+        for path, lang in self.page_paths(url_name):
+            with self.subTest(path=path, lang=lang):
+                self.get_page(path, lang, queries, seconds)
+                self.get_page(path, lang, cached_queries, cached_seconds)
+
+
+class CorePageTests(PublicPageTestCase):
+    def test_home(self):
+        # Products with their first image, and the FAQs
+        self.assertPageBudget("home", queries=3)
+
+    def test_privacy(self):
+        self.assertPageBudget("privacy", queries=0)
+
+    def test_terms(self):
+        self.assertPageBudget("terms", queries=0)
+
+    def test_robots(self):
+        self.assertPageBudget("robots", queries=0)
+
+    # The conditional GET of the sitemap and the feeds asks for the last
+    # change, even when the page is cached. The current site is loaded once.
+
+    def test_sitemap(self):
+        # Count and page of the recipes and of the products
+        self.assertPageBudget(
+            "django.contrib.sitemaps.views.sitemap", queries=7, cached_queries=2
+        )
+
+    def test_product_feed(self):
+        # Products with their first image
+        self.assertPageBudget("product_feed_pins", queries=4, cached_queries=1)
+
+    def test_recipe_feed(self):
+        self.assertPageBudget("recipe_feed_pins", queries=3, cached_queries=1)
+
+    def test_home_lists_the_catalog(self):
+        with translation.override("fr"):
+            path = reverse("home")
+        response = self.client.get(path, HTTP_ACCEPT_LANGUAGE="fr")
+        self.assertContains(response, "Assiette product 0")
+        self.assertContains(response, "Assiette question 0")
+
+    def test_feeds_in_unknown_languages_are_not_found(self):
+        for url_name in ("product_feed_pins", "recipe_feed_pins"):
+            for lang in ("xx", "en-us"):
+                with self.subTest(url_name=url_name, lang=lang):
+                    response = self.client.get(reverse(url_name, args=(lang,)))
+                    self.assertEqual(response.status_code, 404)
+
+    def test_unknown_languages_fall_back_to_german(self):
+        with translation.override("en-us"):
+            product = Product.objects.localized("title").get(
+                title_de="Teller product 0"
+            )
+            self.assertEqual(product.title, "Teller product 0")
+
+    def test_query_plans_use_indexes(self):
+        call_command("checkqueryplans", stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_cached_pages_link_to_the_website_from_any_host(self):
+        for path in (reverse("home"), reverse("robots")):
+            with self.subTest(path=path):
+                self.client.get(path, HTTP_HOST="127.0.0.1")
+                response = self.client.get(path)
+                self.assertContains(response, settings.WEBSITE_URL)
+                self.assertNotContains(response, "127.0.0.1")
+
+
+class ConditionalGetTests(PublicPageTestCase):
+    def setUp(self):
+        super().setUp()
+        # The content and its versions last changed a day ago
+        day_ago = timezone.now() - timedelta(days=1)
+        Recipe.objects.update(updated_at=day_ago)
+        Product.objects.update(updated_at=day_ago)
+        for name in ("recipes", "products", "faqs"):
+            cache.set(version_cache_key(name), int(day_ago.timestamp() * 1e9))
+
+    def assertChangedSince(self, path: str, change: Callable, lang: str = "en"):
+        """
+        ``path`` answers a 304 to a client that has it, and a 200 once the
+        content was changed by ``change``
+        """
+        response = self.client.get(path, HTTP_ACCEPT_LANGUAGE=lang)
+        since = response["Last-Modified"]
+        response = self.client.get(
+            path, HTTP_ACCEPT_LANGUAGE=lang, HTTP_IF_MODIFIED_SINCE=since
+        )
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.client.get(
+            path, HTTP_ACCEPT_LANGUAGE=lang, HTTP_IF_MODIFIED_SINCE=since
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_sitemap_after_a_deletion(self):
+        self.assertChangedSince(
+            reverse("django.contrib.sitemaps.views.sitemap"),
+            lambda: Recipe.objects.first().delete(),
+        )
+
+    def test_product_detail_after_a_faq_change(self):
+        self.assertChangedSince(
+            str(Product.objects.first().url), lambda: Faq.objects.first().save()
+        )
+
+    def test_feed_after_a_product_left_its_window(self):
+        product = Product.objects.first()
+        # Created 30 days ago, it leaves the feed at midnight
+        Product.objects.filter(pk=product.pk).update(
+            created_at=timezone.now() - timedelta(days=FEED_DAYS)
+        )
+        path = reverse("product_feed_pins", args=("en",))
+        response = self.client.get(path)
+        self.assertContains(response, product.title)
+
+        tomorrow = timezone.now() + timedelta(days=1)
+        with mock.patch("django.utils.timezone.now", return_value=tomorrow):
+            response = self.client.get(
+                path, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, product.title)
+
+
+class LanguagePrefixTests(PublicPageTestCase):
+    def setUp(self):
+        super().setUp()
+        # The URLconf is built again once the setting is restored
+        self.addCleanup(reload_urlconf)
+        self.enterContext(override_settings(LANGUAGE_URL_PREFIX=True))
+        reload_urlconf()
+        self.recipe = Recipe.objects.first()
+        with translation.override("fr"):
+            self.path = str(self.recipe.url)
+
+    def test_pages_are_prefixed(self):
+        self.assertTrue(self.path.startswith("/fr/"))
+        response = self.client.get(self.path)
+        self.assertContains(response, "Assiette recipe")
+
+    def test_unprefixed_urls_redirect_once(self):
+        legacy = self.path.removeprefix("/fr")
+        response = self.client.get(legacy, HTTP_ACCEPT_LANGUAGE="fr", follow=True)
+        self.assertEqual(response.redirect_chain, [(self.path, 302)])
+        self.assertContains(response, "Assiette recipe")
+
+    def test_sitemap_lists_the_alternates(self):
+        response = self.client.get(reverse("django.contrib.sitemaps.views.sitemap"))
+        for lang in settings.LANGUAGE_CODES:
+            with translation.override(lang):
+                url = str(self.recipe.url)
+            # Every language of the recipe links to this one
+            alternate = rf'hreflang="{lang}" href="https?://[^/"]+{re.escape(url)}"'
+            with self.subTest(lang=lang):
+                self.assertEqual(
+                    len(re.findall(alternate, response.content.decode())),
+                    len(settings.LANGUAGE_CODES),
+                )
+
+
+@override_settings(DEBUG=True)
+class QueryBudgetTests(PublicPageTestCase):
+    """
+    Budgets are only checked with DEBUG. The views are called directly,
+    the URLs of the debug tools are only added to the URLconf at startup.
+    """
+
+    def render(self, view, lang: str = "en", **kwargs) -> HttpResponse:
+        with translation.override(lang):
+            request = RequestFactory().get("/")
+            response = view(request, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+    def test_an_overrun_raises(self):
+        @query_budget(1)
+        def view(request):
+            return HttpResponse(f"{Product.objects.count()} {Recipe.objects.count()}")
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, "its budget is 1"):
+            self.render(view)
+
+    def test_pages_stay_within_their_budget(self):
+        recipe = Recipe.objects.first()
+        product = Product.objects.first()
+        pages = [
+            (HomeView.as_view(), {}),
+            (RecipeListView.as_view(), {}),
+            (RecipeDetailView.as_view(), {"slug": recipe.slug_en}),
+            (ProductDetailView.as_view(), {"slug": product.slug_en}),
+        ]
+        for view, kwargs in pages:
+            with self.subTest(view=view.__name__):
+                response = self.render(view, **kwargs)
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CacheObjectPageTests(SimpleTestCase):
+    # invalidate_pages bumps the versions on commit
+    databases = ("default",)
+
+    def setUp(self):
+        cache.clear()
+        self.renders = 0
+
+        def view(request, slug):
+            self.renders += 1
+            return HttpResponse(f"render {self.renders}")
+
+        self.view = cache_object_page("test", versions=("faqs",))(view)
+        self.key = page_cache_key("test", "en", "slug")
+
+    def get(self) -> str:
+        with translation.override("en"):
+            response = self.view(RequestFactory().get("/test"), slug="slug")
+        return response.content.decode()
+
+    def test_a_missing_page_is_rendered_once(self):
+        self.assertEqual(self.get(), "render 1")
+        self.assertEqual(self.get(), "render 1")
+        self.assertIsNone(cache.get(f"{self.key}:lock"))
+
+    def test_a_page_invalidated_while_rendering_is_rendered_again(self):
+        render = self.view.__wrapped__
+
+        def view(request, slug):
+            response = render(request, slug)
+            # The content is saved once this render read the old one
+            invalidate_pages("test", [slug])
+            return response
+
+        self.view = cache_object_page("test", versions=("faqs",))(view)
+        self.assertEqual(self.get(), "render 1")
+        self.assertEqual(self.get(), "render 2")
+
+    def test_an_expired_page_is_served_while_one_refresh_is_queued(self):
+        self.get()
+        stamp, fresh_until, page = cache.get(self.key)
+        self.assertGreater(fresh_until, time.time())
+        cache.set(self.key, (stamp, time.time() - 1, page))
+        with mock.patch("core.tasks.task_refresh_page") as refresh:
+            self.assertEqual(self.get(), "render 1")
+            self.assertEqual(self.get(), "render 1")
+        refresh.assert_called_once_with("/test", "en")
+        self.assertEqual(self.renders, 1)
+
+    def test_a_locked_page_waits_for_its_fill(self):
+        acquire_fill_lock(self.key)
+        names = ("faqs", page_version("test", "slug"))
+        versions = get_versions(*names)
+        stamp = tuple(versions[name] for name in names)
+        filled = (stamp, None, CachedPage(HttpResponse("filled")))
+        # The lock holder stores the page while this request waits
+        with mock.patch(
+            "core.cache.time.sleep", side_effect=lambda _: cache.set(self.key, filled)
+        ):
+            self.assertEqual(self.get(), "filled")
+        self.assertEqual(self.renders, 0)
+
+    def test_a_locked_page_falls_back_to_the_previous_version(self):
+        self.get()
+        cache.set(version_cache_key("faqs"), time.time_ns())
+        acquire_fill_lock(self.key)
+        with mock.patch("core.cache.wait_for_fill", return_value=None):
+            self.assertEqual(self.get(), "render 1")
+        self.assertEqual(self.renders, 1)
+
+    def test_a_locked_page_without_a_copy_is_rendered(self):
+        acquire_fill_lock(self.key)
+        with mock.patch("core.cache.wait_for_fill", return_value=None):
+            self.assertEqual(self.get(), "render 1")
+        # The lock belongs to the other worker
+        self.assertIsNotNone(cache.get(f"{self.key}:lock"))
+
+
+class CompressionTests(SimpleTestCase):
+    PRESERVED = (
+        "<pre>  keep\n    this  </pre>",
+        "<textarea>\n  as typed  </textarea>",
+        '<script type="application/ld+json">{"name":  "Couscous",\n "a": 1}</script>',
+    )
+
+    def html_response(self, body: str) -> HttpResponse:
+        return HttpResponse(f"<html>\n  <body>\n    {body}\n  </body>\n</html>")
+
+    def test_whitespace_sensitive_elements_are_kept_byte_for_byte(self):
+        html = "\n    <p>  text  </p>  <!-- comment -->\n".join(self.PRESERVED)
+        minified = minify_html(html)
+        for element in self.PRESERVED:
+            self.assertIn(element, minified)
+        self.assertNotIn("comment", minified)
+
+    def test_small_bodies_are_neither_minified_nor_compressed(self):
+        response = self.html_response("<p>  short  </p>")
+        self.assertEqual(minified_content(response), response.content)
+        self.assertEqual(compress(b"x" * (COMPRESS_MIN_LENGTH - 1)), {})
+
+    def test_large_bodies_are_minified_and_compressed(self):
+        response = self.html_response("<p>  long  </p>\n" * MINIFY_MIN_LENGTH)
+        content = minified_content(response)
+        self.assertLess(len(content), len(response.content))
+        bodies = compress(content)
+        self.assertEqual(gzip.decompress(bodies["gzip"]), content)
+
+    def get_compressed(self, response: HttpResponse, accept: str) -> HttpResponse:
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_middleware_compresses_with_the_dynamic_level(self):
+        body = "<p>  text  </p>\n" * MINIFY_MIN_LENGTH
+        with mock.patch("core.compression.gzip.compress", wraps=gzip.compress) as spy:
+            response = self.get_compressed(self.html_response(body), "gzip")
+        self.assertEqual(spy.call_args.kwargs["compresslevel"], GZIP_LEVEL_DYNAMIC)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn(b"<p> text </p>", gzip.decompress(response.content))
+
+    def test_middleware_without_accepted_encoding(self):
+        body = "<p>  text  </p>\n" * MINIFY_MIN_LENGTH
+        response = self.get_compressed(self.html_response(body), "identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_middleware_leaves_encoded_and_binary_responses(self):
+        encoded = HttpResponse(b"x" * 1000, headers={"Content-Encoding": "br"})
+        image = HttpResponse(b"x" * 1000, content_type="image/png")
+        for response in (encoded, image):
+            with self.subTest(response=response):
+                response = self.get_compressed(response, "gzip")
+                self.assertEqual(response.content, b"x" * 1000)
+                self.assertFalse(response.has_header("Vary"))
+
+
+# A product list that loads the first image of every product on its own
+NPLUSONE_TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "products.html": "{% for product in products %}"
+                        "{{ product.productimage_set.first.pk }}"
+                        "{% endfor %}"
+                    },
+                )
+            ]
+        },
+    }
+]
+
+
+@override_settings(
+    STORAGES=TEST_STORAGES,
+    TEMPLATES=NPLUSONE_TEMPLATES,
+    NPLUSONE_DETECTOR=True,
+    NPLUSONE_THRESHOLD=3,
+    NPLUSONE_RAISE=False,
+)
+class NPlusOneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_catalog(products=6, recipes=0, faqs=0)
+
+    def get(self) -> HttpResponse:
+        def view(request):
+            products = Product.objects.order_by("pk")
+            content = loader.render_to_string("products.html", {"products": products})
+            return HttpResponse(content)
+
+        return NPlusOneMiddleware(view)(RequestFactory().get("/products"))
+
+    def test_repeated_queries_are_reported_with_their_template(self):
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            response = self.get()
+        self.assertRegex(
+            response["X-NPlusOne"],
+            r"^6x products_productimage at products.html:1, core/tests.py:\d+ in view$",
+        )
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("N+1 queries on /products", logs.output[0])
+        self.assertIn("6x products.html:1", logs.output[0])
+
+    @override_settings(NPLUSONE_RAISE=True)
+    def test_repeated_queries_raise(self):
+        with (
+            self.assertLogs("core.middleware", "WARNING"),
+            self.assertRaisesMessage(NPlusOneDetected, "products.html:1"),
+        ):
+            self.get()
+
+    @override_settings(NPLUSONE_THRESHOLD=6)
+    def test_queries_up_to_the_threshold_are_allowed(self):
+        with self.assertNoLogs("core.middleware", "WARNING"):
+            response = self.get()
+        self.assertFalse(response.has_header("X-NPlusOne"))
+
+    @override_settings(NPLUSONE_DETECTOR=False)
+    def test_the_detector_is_off_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            NPlusOneMiddleware(lambda request: HttpResponse())
+
+    def test_parameter_lists_are_one_shape(self):
+        detector = QueryRepeatDetector(threshold=2)
+        sql = 'SELECT * FROM "products_product" WHERE "id" IN ({})'
+        for count in range(1, 4):
+            placeholders = ", ".join(["%s"] * count)
+            detector(lambda *args: None, sql.format(placeholders), (), False, {})
+        [(shape, count, origin)] = detector.repeated()
+        self.assertEqual(shape, 'SELECT * FROM "products_product" WHERE "id" IN (...)')
+        self.assertEqual(count, 3)
+        self.assertEqual(detector.summary(), f"3x products_product at {origin}")
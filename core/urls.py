@@ -1,4 +1,3 @@
-from django.contrib.sitemaps.views import sitemap
 from django.urls import path
 
 from .sitemaps import ProductSitemap, RecipeSitemap
@@ -9,15 +8,17 @@ from .views import (
     RecipeListRedirectView,
     RobotTxtView,
     TermsView,
+    csrf_token_view,
     favicon_view,
     product_feed_pins,
     recipe_feed_pins,
+    sitemap_view,
 )
 
 urlpatterns = [
     path(
         "sitemap.xml",
-        sitemap,
+        sitemap_view,
         {"sitemaps": {"recipes": RecipeSitemap(), "products": ProductSitemap()}},
         name="django.contrib.sitemaps.views.sitemap",
     ),
@@ -25,15 +26,21 @@ urlpatterns = [
     path("favicon.ico", favicon_view, name="favicon"),
     # robots.txt
     path("robots.txt", RobotTxtView.as_view(), name="robots"),
+    # CSRF token for htmx mutations
+    path("~/csrf", csrf_token_view, name="csrf_token"),
+    # Pins
+    path("pins/products/<str:lang>", product_feed_pins, name="product_feed_pins"),
+    path("pins/recipes/<str:lang>", recipe_feed_pins, name="recipe_feed_pins"),
+    # Redirects (previous site)
+    path("<str:lang>/blog/", RecipeListRedirectView.as_view()),
+    path("<str:lang>/blog/<slug:slug>/", RecipeDetailRedirectView.as_view()),
+]
+
+# Pages that can be served under a language prefix (see config.urls)
+page_urlpatterns = [
     # "static" pages
     path("~/p", PrivacyView.as_view(), name="privacy"),
     path("~/t", TermsView.as_view(), name="terms"),
     # Home
     path("", HomeView.as_view(), name="home"),
-    # Pins
-    path("pins/products/<str:lang>", product_feed_pins),
-    path("pins/recipes/<str:lang>", recipe_feed_pins),
-    # Redirects (previous site)
-    path("<str:lang>/blog/", RecipeListRedirectView.as_view()),
-    path("<str:lang>/blog/<slug:slug>/", RecipeDetailRedirectView.as_view()),
 ]
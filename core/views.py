@@ -1,19 +1,28 @@
+from datetime import date
+from functools import wraps
 from typing import Any
 
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.contrib.sitemaps.views import sitemap
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render
 from django.urls import reverse
-from django.utils import translation
+from django.utils import timezone, translation
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.cache import cache_control, cache_page
+from django.views.decorators.cache import cache_control, never_cache
 from django.views.decorators.http import require_GET
 from django.views.generic import RedirectView, TemplateView
 
+from core.cache import cache_object_page, conditional_page, get_versions
+from core.debug import query_budget
 from core.models import Faq
 from products.models import Product
+from recipes.models import Recipe
 
-from .feeds import ProductPinFeed, RecipePinFeed
+from .feeds import ProductPinFeed, RecipePinFeed, feed_last_modified
+from .sitemaps import sitemap_last_modified
 
 
 class RecipeListRedirectView(RedirectView):
@@ -26,7 +35,11 @@ class RecipeDetailRedirectView(RedirectView):
         return reverse("recipe_detail", kwargs={"slug": self.kwargs["slug"]})
 
 
-# @method_decorator(cache_page(60 * 10), name="dispatch")
+@method_decorator(
+    cache_object_page("home", versions=("products", "faqs")), name="dispatch"
+)
+# Products, their first images and FAQs
+@method_decorator(query_budget(3), name="dispatch")
 class HomeView(TemplateView):
     http_method_names = ["get"]
     template_name = "home.html"
@@ -34,12 +47,14 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         cxt = super().get_context_data(**kwargs)
         cxt["page_title"] = _("Tasty recipes make from Bern")
-        cxt["products"] = Product.objects.filter().exclude(productimage__isnull=True)
-        cxt["faqs"] = Faq.objects.filter(is_active=True)
+        products = Product.objects.with_images().with_first_image()
+        cxt["products"] = products.localized("title", "slug")
+        cxt["faqs"] = Faq.objects.active()
+        cxt["versions"] = get_versions("products", "faqs")
         return cxt
 
 
-@method_decorator(cache_page(60 * 60 * 24), name="dispatch")
+@method_decorator(cache_object_page("privacy", timeout=60 * 60 * 24), name="dispatch")
 class PrivacyView(TemplateView):
     http_method_names = ["get"]
     template_name = "privacy.html"
@@ -50,7 +65,7 @@ class PrivacyView(TemplateView):
         return cxt
 
 
-@method_decorator(cache_page(60 * 60 * 24), name="dispatch")
+@method_decorator(cache_object_page("terms", timeout=60 * 60 * 24), name="dispatch")
 class TermsView(TemplateView):
     http_method_names = ["get"]
     template_name = "terms.html"
@@ -61,7 +76,7 @@ class TermsView(TemplateView):
         return cxt
 
 
-@method_decorator(cache_page(60 * 60 * 24), name="dispatch")
+@method_decorator(cache_object_page("robots", timeout=60 * 60 * 24), name="dispatch")
 class RobotTxtView(TemplateView):
     http_method_names = ["get"]
     content_type = "text/plain"
@@ -80,6 +95,13 @@ def favicon_view(request) -> HttpResponse:
     return HttpResponse(svg_content, content_type="image/svg+xml; charset=utf-8")
 
 
+@require_GET
+@never_cache
+def csrf_token_view(request) -> JsonResponse:
+    # Pages don't embed the token, so that they are served without cookies
+    return JsonResponse({"token": get_token(request)})
+
+
 def error_404(request, exception):
     cxt = {"page_title": _("Page Not found")}
     return render(request, "error.html", cxt, status=404)
@@ -95,11 +117,52 @@ def error_500(request):
     return render(request, "error.html", cxt, status=500)
 
 
+@conditional_page(sitemap_last_modified, versions=("recipes", "products"))
+@cache_object_page("sitemap", versions=("recipes", "products"))
+def sitemap_view(request: HttpRequest, sitemaps: dict):
+    return sitemap(request, sitemaps)
+
+
+# The feeds are cached per day, under the language of the url (see below)
+@cache_object_page("product_pins", ident_kwarg="day", versions=("products",))
+def product_pins(request: HttpRequest, day: str):
+    return ProductPinFeed()(request, day=date.fromisoformat(day))
+
+
+@cache_object_page("recipe_pins", ident_kwarg="day", versions=("recipes",))
+def recipe_pins(request: HttpRequest, day: str):
+    return RecipePinFeed()(request, day=date.fromisoformat(day))
+
+
+def product_pins_last_modified(request: HttpRequest, lang: str):
+    return feed_last_modified(Product, timezone.localdate())
+
+
+def recipe_pins_last_modified(request: HttpRequest, lang: str):
+    return feed_last_modified(Recipe, timezone.localdate())
+
+
+def require_language(view_func):
+    """Answer a 404 for a ``lang`` the site isn't translated in"""
+
+    @wraps(view_func)
+    def _wrapper(request: HttpRequest, lang: str, *args, **kwargs):
+        if lang not in settings.LANGUAGE_CODES:
+            raise Http404
+        return view_func(request, lang, *args, **kwargs)
+
+    return _wrapper
+
+
+@require_language
+@conditional_page(product_pins_last_modified, versions=("products",))
 def product_feed_pins(request: HttpRequest, lang: str):
     with translation.override(lang):
-        return ProductPinFeed()(request)
+        return product_pins(request, day=timezone.localdate().isoformat())
 
 
+@require_language
+@conditional_page(recipe_pins_last_modified, versions=("recipes",))
 def recipe_feed_pins(request: HttpRequest, lang: str):
     with translation.override(lang):
-        return RecipePinFeed()(request)
+        return recipe_pins(request, day=timezone.localdate().isoformat())
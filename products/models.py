@@ -7,7 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill, Transpose
 
-from config.db import CustomModel, PageModel
+from config.db import CustomModel, LocalizedQuerySet, PageModel
 
 
 class ProductType(models.TextChoices):
@@ -19,6 +19,33 @@ class ProductType(models.TextChoices):
     OTHER = "other", _("Other products")
 
 
+class ProductQuerySet(LocalizedQuerySet):
+    def with_images(self):
+        """Only the products that have at least one image"""
+        images = ProductImage.objects.filter(product=models.OuterRef("pk"))
+        return self.filter(models.Exists(images))
+
+    def with_first_image(self):
+        """Prefetch the first image of each product, see ``first_image``"""
+        return self.prefetch_related(
+            models.Prefetch(
+                "productimage_set",
+                queryset=ProductImage.objects.order_by("pk")[:1],
+                to_attr="first_images",
+            )
+        )
+
+    def with_all_images(self):
+        """Prefetch the images of each product, in order, into ``images``"""
+        return self.prefetch_related(
+            models.Prefetch(
+                "productimage_set",
+                queryset=ProductImage.objects.order_by("pk"),
+                to_attr="images",
+            )
+        )
+
+
 class Product(PageModel):
     description_de = models.TextField()
     description_en = models.TextField(null=True, blank=True)
@@ -91,6 +118,14 @@ class Product(PageModel):
         null=True,
     )
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="product_created_idx"),
+            models.Index(fields=["updated_at"], name="product_updated_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -106,6 +141,12 @@ class Product(PageModel):
     def get_absolute_url(self):
         return reverse_lazy("product_detail", args=(self.slug,))
 
+    @property
+    def first_image(self) -> "ProductImage | None":
+        if hasattr(self, "first_images"):
+            return next(iter(self.first_images), None)
+        return self.productimage_set.order_by("pk").first()
+
     @property
     def description(self):
         return self.get_localized_value("description") or self.description_de
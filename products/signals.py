@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.cache import bump_version, invalidate_pages
+
+from .models import Product, ProductImage
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product(sender, instance: Product, **kwargs):
+    invalidate_pages("product_detail", instance.cached_slugs)
+    bump_version("products")
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_product_image(sender, instance: ProductImage, **kwargs):
+    invalidate_pages("product_detail", Product.slugs_for(pk=instance.product_id))
+    bump_version("products")
+    # update() sends no signals, so the product is not invalidated twice
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
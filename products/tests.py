@@ -1 +1,35 @@
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+
+from core.purge import PurgeServer
+from core.tests import PublicPageTestCase
+from products.models import Product
+
+
+class ProductPageTests(PublicPageTestCase):
+    def test_product_detail(self):
+        # Slug index and last change for the conditional GET, then the
+        # product with its images and the FAQs
+        self.assertPageBudget("product_detail", queries=5, cached_queries=1)
+
+    def test_unknown_slugs_are_not_memoized(self):
+        self.assertIsNone(Product.pk_for_slug("unknown"))
+        self.assertIsNone(cache.get(Product.slug_cache_key("unknown")))
+
+        product = Product.objects.first()
+        self.assertEqual(Product.pk_for_slug(product.slug_fr), product.pk)
+        self.assertIsNotNone(cache.get(Product.slug_cache_key(product.slug_fr)))
+
+    def test_saving_a_product_purges_its_pages(self):
+        product = Product.objects.first()
+        with (
+            PurgeServer() as server,
+            override_settings(
+                PURGE_BACKEND="core.purge.HTTPPurgeBackend", PURGE_URL=server.url
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            product.save()
+        purged = {tag for tags in server.purged for tag in tags}
+        self.assertIn("products", purged)
+        self.assertIn(f"product_detail:{product.slug_fr}", purged)
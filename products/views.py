@@ -1,29 +1,36 @@
-from functools import reduce
-from operator import or_
-
-from django.conf import settings
-from django.db.models import Q
 from django.http import Http404
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.views.generic.detail import DetailView
 
+from core.cache import cache_object_page, conditional_page, get_versions
+from core.debug import query_budget
 from core.models import Faq
 from products.models import Product
 
 
-@method_decorator(cache_page(60 * 10), name="dispatch")
+def product_last_modified(request, slug):
+    products = Product.objects.filter(pk=Product.pk_for_slug(slug))
+    return products.values_list("updated_at", flat=True).first()
+
+
+@method_decorator(
+    conditional_page(product_last_modified, versions=("faqs",)), name="dispatch"
+)
+@method_decorator(
+    cache_object_page("product_detail", versions=("faqs",)),
+    name="dispatch",
+)
+# Slug index, product, images and FAQs
+@method_decorator(query_budget(4), name="dispatch")
 class ProductDetailView(DetailView):
     template_name = "product_detail.html"
     model = Product
     context_object_name = "product"
 
     def get_object(self, queryset=...):
-        slug = self.kwargs["slug"]
-        slug_d = {f"slug_{lang}": slug for lang in settings.LANGUAGE_CODES}
-        expr = reduce(or_, (Q(**d) for d in [dict([i]) for i in slug_d.items()]))
+        pk = Product.pk_for_slug(self.kwargs["slug"])
         try:
-            self.object = Product.objects.get(expr)
+            self.object = Product.objects.with_all_images().get(pk=pk)
             return self.object
         except Product.DoesNotExist as err:
             raise Http404 from err
@@ -32,5 +39,8 @@ class ProductDetailView(DetailView):
         cxt = super().get_context_data(**kwargs)
         cxt["page_title"] = self.object.title
         cxt["page_description"] = self.object.description[:300]
-        cxt["faqs"] = Faq.objects.filter(is_active=True)
+        # Loaded and counted once for the carousel and its thumbnails
+        cxt["images"] = self.object.images
+        cxt["faqs"] = Faq.objects.active()
+        cxt["versions"] = get_versions("faqs")
         return cxt
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from recipes.tasks import task_build_json_schemas
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the JSON-LD of the recipes that have none yet, run on deploy so "
+        "that pages never render it inline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Build it again for every recipe"
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.all()
+        if not options["all"]:
+            recipes = recipes.filter(json_schemas={})
+        recipe_ids = list(recipes.values_list("pk", flat=True))
+        for recipe_id in recipe_ids:
+            task_build_json_schemas.call_local(recipe_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Built the JSON-LD of {len(recipe_ids)} recipes")
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+# Frozen copies, the migration must not change with the models
+LANGUAGE_CODES = ["de", "en", "es", "fr", "it"]
+
+
+def ingredient_line(quantity, unit, ingredient, lang: str) -> str:
+    plural = bool(quantity) and quantity != 1
+
+    def localized(obj, attr):
+        return getattr(obj, f"{attr}_{lang}", None) or getattr(obj, f"{attr}_de")
+
+    parts = []
+    if quantity is not None:
+        parts.append(str(quantity).replace(".00", ""))
+    if unit:
+        parts.append(
+            unit.abbreviation or localized(unit, "name_plural" if plural else "name")
+        )
+    parts.append(localized(ingredient, "name_plural" if plural else "name"))
+    return " ".join(parts)
+
+
+def build_display_lines(apps, schema_editor):
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    items = list(RecipeIngredient.objects.select_related("unit", "ingredient"))
+    for item in items:
+        item.display_lines = {
+            lang: ingredient_line(item.quantity, item.unit, item.ingredient, lang)
+            for lang in LANGUAGE_CODES
+        }
+    RecipeIngredient.objects.bulk_update(items, ["display_lines"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0009_alter_ingredient_name_de_alter_unit_name_de"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipeingredient",
+            name="display_lines",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(build_display_lines, migrations.RunPython.noop),
+    ]
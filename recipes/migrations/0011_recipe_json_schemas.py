@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0010_recipeingredient_display_lines"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="json_schemas",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("recipes", "0011_recipe_json_schemas"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["-created_at"], name="recipe_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["updated_at"], name="recipe_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                condition=models.Q(("main_image", ""), _negated=True),
+                fields=["-created_at"],
+                name="recipe_with_image_idx",
+            ),
+        ),
+    ]
@@ -1,12 +1,14 @@
 import json
 
+from django.conf import settings
 from django.db import models
 from django.urls import reverse_lazy
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from imagekit.models import ImageSpecField
 from imagekit.processors import ResizeToFill, Transpose
 
-from config.db import CustomModel, PageModel
+from config.db import CustomModel, LocalizedQuerySet, PageModel
 
 
 class Unit(CustomModel):
@@ -87,6 +89,18 @@ class RecipeCategory(models.TextChoices):
     BREAD = "bread", _("Bread")
 
 
+class RecipeQuerySet(LocalizedQuerySet):
+    def with_details(self):
+        """
+        Prefetch the ingredients (with their units and names) and the steps,
+        which the detail page and the JSON-LD both read
+        """
+        ingredients = RecipeIngredient.objects.select_related("unit", "ingredient")
+        return self.prefetch_related(
+            models.Prefetch("ingredients", queryset=ingredients), "steps"
+        )
+
+
 class Recipe(PageModel):
     """Main recipe model"""
 
@@ -169,6 +183,11 @@ class Recipe(PageModel):
         options={"quality": 90},
     )
 
+    # JSON-LD documents per language, built by recipes.tasks
+    json_schemas = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
     @property
     def introduction(self):
         return self.get_localized_value("introduction") or self.introduction_de
@@ -191,6 +210,18 @@ class Recipe(PageModel):
 
     @property
     def json_schema(self):
+        """
+        Return the stored JSON-LD, rendering it inline if it is missing.
+
+        The save signals store it, and ``build_json_schemas`` fills the
+        recipes that have none on deploy.
+        """
+        schema = self.json_schemas.get(get_language())
+        if schema is None:
+            schema = self.build_json_schema()
+        return schema
+
+    def build_json_schema(self):
         """Return structured data for Recipe (JSON-LD)."""
         ingredients_list = [str(ri) for ri in self.ingredients.all()]
 
@@ -242,6 +273,41 @@ class Recipe(PageModel):
         ordering = ["-created_at"]
         verbose_name = _("Recipe")
         verbose_name_plural = _("Recipes")
+        indexes = [
+            models.Index(fields=["-created_at"], name="recipe_created_idx"),
+            models.Index(fields=["updated_at"], name="recipe_updated_idx"),
+            # Recipe list and pin feed only show recipes with an image
+            models.Index(
+                fields=["-created_at"],
+                condition=~models.Q(main_image=""),
+                name="recipe_with_image_idx",
+            ),
+        ]
+
+
+def ingredient_line(quantity, unit, ingredient, lang: str) -> str:
+    """Human-readable representation like '2 cups flour' or '1 egg'."""
+    plural = bool(quantity) and quantity != 1
+
+    def localized(obj, attr):
+        return getattr(obj, f"{attr}_{lang}", None) or getattr(obj, f"{attr}_de")
+
+    parts = []
+
+    # Quantity
+    if quantity is not None:
+        parts.append(str(quantity).replace(".00", ""))
+
+    # Unit (prefer abbreviation if present)
+    if unit:
+        parts.append(
+            unit.abbreviation or localized(unit, "name_plural" if plural else "name")
+        )
+
+    # Ingredient name (singular/plural)
+    parts.append(localized(ingredient, "name_plural" if plural else "name"))
+
+    return " ".join(parts)
 
 
 class RecipeIngredient(CustomModel):
@@ -273,40 +339,34 @@ class RecipeIngredient(CustomModel):
         verbose_name=_("Unit"),
     )
 
-    def get_display_unit(self):
-        """Return localized singular or plural unit name."""
-        if not self.unit:
-            return None
-        if self.quantity and self.quantity != 1:
-            return self.unit.name_plural
-        return self.unit.name
-
-    def get_display_ingredient(self):
-        """Return localized singular or plural ingredient name."""
-        if self.quantity and self.quantity != 1:
-            return self.ingredient.name_plural
-        return self.ingredient.name
-
-    def __str__(self):
-        """Human-readable representation like '2 cups flour' or '1 egg'."""
-        parts = []
+    # Rendered lines per language, e.g. {"de": "200 g Mehl", "en": "200 g flour"}
+    display_lines = models.JSONField(default=dict, blank=True, editable=False)
 
-        # Quantity
-        if self.quantity is not None:
-            parts.append(str(self.quantity).replace(".00", ""))
+    def build_display_lines(self) -> dict[str, str]:
+        return {
+            lang: ingredient_line(self.quantity, self.unit, self.ingredient, lang)
+            for lang in settings.LANGUAGE_CODES
+        }
 
-        # Unit
-        if self.unit:
-            # Prefer abbreviation if present
-            if self.unit.abbreviation:
-                parts.append(self.unit.abbreviation)
-            else:
-                parts.append(self.get_display_unit())
+    @classmethod
+    def rebuild_display_lines(cls, **filters):
+        """Re-render the stored lines, e.g. after a unit or ingredient changed"""
+        items = list(cls.objects.filter(**filters).select_related("unit", "ingredient"))
+        for item in items:
+            item.display_lines = item.build_display_lines()
+        cls.objects.bulk_update(items, ["display_lines"])
 
-        # Ingredient name (singular/plural)
-        parts.append(self.get_display_ingredient())
+    def save(self, *args, **kwargs):
+        self.display_lines = self.build_display_lines()
+        return super().save(*args, **kwargs)
 
-        return " ".join(parts)
+    def __str__(self):
+        """Human-readable representation like '2 cups flour' or '1 egg'."""
+        lang = get_language()
+        line = self.display_lines.get(lang)
+        if line is None:
+            line = ingredient_line(self.quantity, self.unit, self.ingredient, lang)
+        return line
 
     class Meta:
         ordering = ["id"]
@@ -0,0 +1,91 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from config.db import on_commit_once
+from core.cache import bump_version, invalidate_pages
+
+from .models import Ingredient, Recipe, RecipeIngredient, RecipeStep, Unit
+from .tasks import task_build_json_schemas
+
+
+def invalidate_recipe_pages(slugs) -> None:
+    invalidate_pages("recipe_detail", slugs)
+    invalidate_pages("recipe_list")
+    bump_version("recipes")
+
+
+def schedule_json_schemas(recipe_ids) -> None:
+    for recipe_id in set(recipe_ids):
+        on_commit_once(
+            f"json_schemas:{recipe_id}",
+            lambda recipe_id=recipe_id: task_build_json_schemas(recipe_id),
+        )
+
+
+def touch_recipes(**filters) -> None:
+    """Propagate a change of a child row to Recipe.updated_at"""
+    # update() sends no signals, so the recipe is not invalidated twice
+    Recipe.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+def recipe_ids(**filters) -> set[int]:
+    return set(Recipe.objects.filter(**filters).values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def invalidate_recipe(sender, instance: Recipe, **kwargs):
+    invalidate_recipe_pages(instance.cached_slugs)
+
+
+@receiver(post_save, sender=Recipe)
+def build_recipe_json_schemas(sender, instance: Recipe, **kwargs):
+    schedule_json_schemas([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=RecipeIngredient)
+@receiver([post_save, post_delete], sender=RecipeStep)
+def invalidate_recipe_child(sender, instance, **kwargs):
+    invalidate_recipe_pages(Recipe.slugs_for(pk=instance.recipe_id))
+    schedule_json_schemas([instance.recipe_id])
+    touch_recipes(pk=instance.recipe_id)
+
+
+# Relations are still in place before the delete (units are SET_NULL)
+@receiver([post_save, pre_delete], sender=Unit)
+def invalidate_unit(sender, instance: Unit, **kwargs):
+    invalidate_recipe_pages(Recipe.slugs_for(ingredients__unit=instance))
+
+
+@receiver([post_save, pre_delete], sender=Ingredient)
+def invalidate_ingredient(sender, instance: Ingredient, **kwargs):
+    invalidate_recipe_pages(Recipe.slugs_for(ingredients__ingredient=instance))
+
+
+@receiver(post_save, sender=Unit)
+def rebuild_unit_lines(sender, instance: Unit, **kwargs):
+    RecipeIngredient.rebuild_display_lines(unit=instance)
+    schedule_json_schemas(recipe_ids(ingredients__unit=instance))
+    touch_recipes(ingredients__unit=instance)
+
+
+@receiver(pre_delete, sender=Unit)
+def remember_unit_lines(sender, instance: Unit, **kwargs):
+    instance._recipe_ingredient_ids = list(
+        RecipeIngredient.objects.filter(unit=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Unit)
+def rebuild_deleted_unit_lines(sender, instance: Unit, **kwargs):
+    ids = getattr(instance, "_recipe_ingredient_ids", [])
+    RecipeIngredient.rebuild_display_lines(pk__in=ids)
+    schedule_json_schemas(recipe_ids(ingredients__pk__in=ids))
+    touch_recipes(ingredients__pk__in=ids)
+
+
+@receiver(post_save, sender=Ingredient)
+def rebuild_ingredient_lines(sender, instance: Ingredient, **kwargs):
+    RecipeIngredient.rebuild_display_lines(ingredient=instance)
+    schedule_json_schemas(recipe_ids(ingredients__ingredient=instance))
+    touch_recipes(ingredients__ingredient=instance)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.utils import translation
+from huey.contrib.djhuey import db_task
+
+from core.cache import invalidate_pages
+
+from .models import Recipe
+
+
+@db_task()
+def task_build_json_schemas(recipe_id: int):
+    recipe = Recipe.objects.with_details().filter(pk=recipe_id).first()
+    if recipe is None:
+        return
+
+    schemas = {}
+    for lang in settings.LANGUAGE_CODES:
+        with translation.override(lang):
+            schemas[lang] = recipe.build_json_schema()
+
+    # update() does not send signals, which would schedule this task again
+    Recipe.objects.filter(pk=recipe_id).update(json_schemas=schemas)
+    # Pages rendered before the documents were stored may embed old ones
+    invalidate_pages("recipe_detail", recipe.slugs)
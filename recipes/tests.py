@@ -1 +1,104 @@
-# Create your tests here.
+import io
+from unittest import mock
+
+from django.contrib.redirects.models import Redirect
+from django.core.management import call_command
+from django.utils import translation
+
+from core.cache import render_page
+from core.tests import PublicPageTestCase
+from recipes.models import Recipe
+
+
+class RecipePageTests(PublicPageTestCase):
+    def test_recipe_list(self):
+        self.assertPageBudget("recipe_list", queries=1)
+
+    def test_recipe_detail(self):
+        # Slug index and last change for the conditional GET, then the
+        # recipe with its ingredients (with units and names) and steps
+        self.assertPageBudget("recipe_detail", queries=5, cached_queries=1)
+
+    def test_recipe_detail_in_fallback_language(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 0")
+        with translation.override("it"):
+            response = self.client.get(str(recipe.url), HTTP_ACCEPT_LANGUAGE="it")
+        self.assertContains(response, "Teller recipe 0")
+        self.assertContains(response, "application/ld+json")
+
+    def test_rendered_recipe_is_served_from_the_cache(self):
+        path = str(Recipe.objects.first().url)
+        response = render_page(path, "en")
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get(path, HTTP_ACCEPT_LANGUAGE="en")
+        self.assertEqual(response.status_code, 200)
+
+    def test_recipe_detail_without_stored_json_schemas(self):
+        # Rendered inline within the budget, and stored on the next deploy
+        Recipe.objects.update(json_schemas={})
+        self.assertPageBudget("recipe_detail", queries=5, cached_queries=1)
+        self.assertFalse(Recipe.objects.exclude(json_schemas={}).exists())
+
+        call_command("build_json_schemas", stdout=io.StringIO())
+        self.assertFalse(Recipe.objects.filter(json_schemas={}).exists())
+
+
+class RecipeRedirectTests(PublicPageTestCase):
+    def test_renaming_redirects_only_the_changed_language(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 1")
+        old_url = self.url(recipe, "fr")
+        recipe.title_fr = "Assiette renommée 1"
+        recipe.save()
+
+        self.assertEqual(
+            list(Redirect.objects.values_list("old_path", "new_path")),
+            [(old_url, self.url(recipe, "fr"))],
+        )
+        response = self.client.get(old_url, HTTP_ACCEPT_LANGUAGE="fr")
+        self.assertRedirects(
+            response, self.url(recipe, "fr"), status_code=301, target_status_code=200
+        )
+
+    def test_renaming_again_updates_the_redirect(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 1")
+        old_url = self.url(recipe, "en")
+        for title in ("Plate renamed", "Plate renamed again"):
+            recipe.title_en = title
+            recipe.save()
+        # Both earlier urls lead to the current one directly
+        self.assertEqual(Redirect.objects.count(), 2)
+        self.assertEqual(
+            Redirect.objects.get(old_path=old_url).new_path, self.url(recipe, "en")
+        )
+
+    def test_undoing_a_rename_removes_its_redirect(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 1")
+        original_url = self.url(recipe, "en")
+        recipe.title_en = "Plate renamed"
+        recipe.save()
+        renamed_url = self.url(recipe, "en")
+        recipe.title_en = "Plate recipe 1"
+        recipe.save()
+        self.assertEqual(
+            list(Redirect.objects.values_list("old_path", "new_path")),
+            [(renamed_url, original_url)],
+        )
+
+    def test_renaming_purges_the_pages_of_the_old_slug(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 1")
+        recipe.title_en = "Plate renamed"
+        with mock.patch("recipes.signals.invalidate_pages") as invalidate:
+            recipe.save()
+        invalidate.assert_any_call("recipe_detail", recipe.slugs | {"plate-recipe-1"})
+
+    def test_saving_without_changes_writes_no_redirect(self):
+        recipe = Recipe.objects.get(title_de="Teller recipe 1")
+        # The update and the slug index, in a savepoint
+        with self.assertNumQueries(4):
+            recipe.save()
+        self.assertFalse(Redirect.objects.exists())
+
+    def url(self, recipe: Recipe, lang: str) -> str:
+        with translation.override(lang):
+            return str(recipe.url)
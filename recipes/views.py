@@ -1,26 +1,30 @@
-from functools import reduce
-from operator import or_
-
-from django.conf import settings
-from django.db.models import Q
 from django.http import Http404
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy as _
-from django.views.decorators.cache import cache_page
 from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
 
+from core.cache import cache_object_page, conditional_page
+from core.debug import query_budget
+
 from .models import Recipe
 
 
-@method_decorator(cache_page(60 * 20), name="dispatch")
+def recipe_last_modified(request, slug):
+    recipes = Recipe.objects.filter(pk=Recipe.pk_for_slug(slug))
+    return recipes.values_list("updated_at", flat=True).first()
+
+
+@method_decorator(cache_object_page("recipe_list"), name="dispatch")
+@method_decorator(query_budget(1), name="dispatch")
 class RecipeListView(ListView):
     template_name = "recipes/recipe_list.html"
     model = Recipe
     context_object_name = "recipes"
 
     def get_queryset(self):
-        return super().get_queryset().exclude(main_image="")
+        recipes = super().get_queryset().exclude(main_image="")
+        return recipes.only("main_image").localized("title", "slug")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -28,21 +32,19 @@ class RecipeListView(ListView):
         return context
 
 
-@method_decorator(cache_page(60 * 10), name="dispatch")
+@method_decorator(conditional_page(recipe_last_modified), name="dispatch")
+@method_decorator(cache_object_page("recipe_detail"), name="dispatch")
+# Slug index, recipe, ingredients (with units and names) and steps
+@method_decorator(query_budget(4), name="dispatch")
 class RecipeDetailView(DetailView):
     template_name = "recipes/recipe_detail.html"
     model = Recipe
     context_object_name = "recipe"
 
     def get_object(self, queryset=None):
-        slug = self.kwargs["slug"]
-        slug_d = {f"slug_{lang}": slug for lang in settings.LANGUAGE_CODES}
-        expr = reduce(or_, (Q(**d) for d in [dict([i]) for i in slug_d.items()]))
+        pk = Recipe.pk_for_slug(self.kwargs["slug"])
         try:
-            self.object = Recipe.objects.prefetch_related(
-                "ingredients__unit",
-                "ingredients__ingredient",
-            ).get(expr)
+            self.object = Recipe.objects.with_details().get(pk=pk)
             return self.object
         except Recipe.DoesNotExist as err:
             raise Http404 from err
@@ -1,6 +1,8 @@
 git pull
 uv run manage.py migrate
+uv run manage.py build_json_schemas
 uv run manage.py compilemessages
 uv run manage.py collectstatic --noinput
 sudo systemctl restart huey_khadijarecipes.service
 sudo systemctl restart gunicorn_khadijarecipes.service
+uv run manage.py warmcache
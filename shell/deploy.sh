@@ -1,5 +1,7 @@
 git pull
 uv run manage.py migrate
+uv run manage.py build_json_schemas
 uv run manage.py compilemessages
 sudo systemctl restart huey_khadijarecipes.service
 sudo systemctl restart gunicorn_khadijarecipes.service
+uv run manage.py warmcache